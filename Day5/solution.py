@@ -1,3 +1,11 @@
+import heapq
+import os
+import tempfile
+from array import array
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+
+
 def parse_input(input_file):
     """
     Parse the input file to extract fresh ingredient ranges and available IDs.
@@ -46,38 +54,127 @@ def count_fresh_ingredients(ranges, ingredient_ids):
     return fresh_count
 
 
-def merge_ranges(ranges):
+def coalesce_sorted_ranges(sorted_ranges):
+    """
+    Merge an iterable of ranges that is already sorted by start position.
+    Yields non-overlapping (start, end) tuples, merging adjacent ranges too.
+    """
+    current_start = current_end = None
+
+    for start, end in sorted_ranges:
+        if current_start is None:
+            current_start, current_end = start, end
+        elif start <= current_end + 1:
+            current_end = max(current_end, end)
+        else:
+            yield (current_start, current_end)
+            current_start, current_end = start, end
+
+    if current_start is not None:
+        yield (current_start, current_end)
+
+
+def merge_ranges(ranges, workers=1):
     """
     Merge overlapping ranges into non-overlapping ranges.
     Returns a list of merged (start, end) tuples.
+    With workers > 1 the merge is partitioned across processes
+    (see merge_ranges_parallel); the result is identical.
     """
     if not ranges:
         return []
 
-    # Sort ranges by start position
-    sorted_ranges = sorted(ranges)
+    if workers > 1:
+        return merge_ranges_parallel(ranges, workers)
 
-    merged = [sorted_ranges[0]]
+    # Sort ranges by start position, then coalesce overlapping/adjacent ones
+    return list(coalesce_sorted_ranges(sorted(ranges)))
 
-    for current_start, current_end in sorted_ranges[1:]:
-        last_start, last_end = merged[-1]
 
-        # Check if current range overlaps with the last merged range
-        if current_start <= last_end + 1:
-            # Merge by extending the end of the last range
-            merged[-1] = (last_start, max(last_end, current_end))
-        else:
-            # No overlap, add as a new range
-            merged.append((current_start, current_end))
+def choose_split_points(ranges, num_partitions, sample_size=1000):
+    """
+    Pick up to num_partitions - 1 split points in key space by sampling range starts.
+    Returns a sorted list of distinct split values; partition i covers IDs in
+    [splits[i - 1], splits[i] - 1], with the first and last partitions unbounded.
+    """
+    if num_partitions <= 1 or not ranges:
+        return []
+
+    # Deterministic evenly strided sample of the starts
+    stride = max(1, len(ranges) // sample_size)
+    sample = sorted(ranges[i][0] for i in range(0, len(ranges), stride))
+
+    splits = set()
+    for k in range(1, num_partitions):
+        splits.add(sample[k * len(sample) // num_partitions])
+
+    # A split at the smallest sampled start would leave the first partition empty
+    splits.discard(sample[0])
+    return sorted(splits)
+
+
+def partition_ranges(ranges, splits):
+    """
+    Distribute ranges into len(splits) + 1 key-space partitions.
+    Ranges that straddle a split point are clipped into one piece per partition.
+    """
+    partitions = [[] for _ in range(len(splits) + 1)]
+
+    for start, end in ranges:
+        first = bisect_right(splits, start)
+        last = bisect_right(splits, end)
+        for p in range(first, last + 1):
+            low = splits[p - 1] if p > 0 else start
+            high = splits[p] - 1 if p < len(splits) else end
+            partitions[p].append((max(start, low), min(end, high)))
+
+    return partitions
+
 
-    return merged
+def _merge_partition(partition):
+    """
+    Worker entry point: merge one partition and count the IDs it covers.
+    """
+    merged = merge_ranges(partition)
+    return merged, sum(end - start + 1 for start, end in merged)
 
 
-def count_total_fresh_ids(ranges):
+def _merge_partitions(ranges, workers):
+    """
+    Partition ranges by sampled split points and merge the partitions in a
+    process pool. Returns the per-partition (merged, count) results in key order.
+    """
+    splits = choose_split_points(ranges, workers)
+    partitions = [p for p in partition_ranges(ranges, splits) if p]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_merge_partition, partitions))
+
+
+def merge_ranges_parallel(ranges, workers):
+    """
+    Merge ranges with a pool of worker processes.
+    Each key-space partition is merged independently, then the partition
+    results are stitched: pieces clipped at a split point are adjacent across
+    the boundary, so one coalescing pass over the concatenation rejoins them.
+    """
+    if not ranges:
+        return []
+
+    results = _merge_partitions(ranges, workers)
+    return list(coalesce_sorted_ranges(r for merged, _ in results for r in merged))
+
+
+def count_total_fresh_ids(ranges, workers=1):
     """
     Count the total number of ingredient IDs that are considered fresh.
     This counts all IDs within all ranges (after merging overlaps).
+    With workers > 1 the partitions are merged and counted in parallel;
+    partitions are disjoint in key space, so their counts simply add up.
     """
+    if workers > 1 and ranges:
+        return sum(count for _, count in _merge_partitions(ranges, workers))
+
     merged = merge_ranges(ranges)
 
     total = 0
@@ -88,6 +185,175 @@ def count_total_fresh_ids(ranges):
     return total
 
 
+class FreshRangeIndex:
+    """
+    Prefix-sum index over merged fresh ranges for fast coverage queries.
+    Answers "how many fresh IDs lie in [a, b]" with two binary searches.
+    """
+    def __init__(self, ranges):
+        merged = merge_ranges(ranges)
+        self.starts = [start for start, _ in merged]
+        self.ends = [end for _, end in merged]
+        # prefix[i] = number of fresh IDs in the first i merged ranges
+        self.prefix = [0]
+        for start, end in merged:
+            self.prefix.append(self.prefix[-1] + end - start + 1)
+
+    def count_up_to(self, x):
+        """Count the fresh IDs that are <= x."""
+        i = bisect_right(self.starts, x) - 1
+        if i < 0:
+            return 0
+        return self.prefix[i] + min(x, self.ends[i]) - self.starts[i] + 1
+
+    def count_in_window(self, a, b):
+        """Count the fresh IDs in the inclusive window [a, b]."""
+        if b < a:
+            return 0
+        return self.count_up_to(b) - self.count_up_to(a - 1)
+
+    def count_in_windows(self, windows):
+        """
+        Batch form of count_in_window.
+        windows: iterable of (a, b) pairs. Returns a list of counts.
+        """
+        return [self.count_in_window(a, b) for a, b in windows]
+
+    def contains(self, ingredient_id):
+        """Check if an ingredient ID is fresh in O(log R)."""
+        i = bisect_right(self.starts, ingredient_id) - 1
+        return i >= 0 and ingredient_id <= self.ends[i]
+
+
+def iter_ranges(input_file):
+    """
+    Stream the fresh ingredient ranges from the first section of the input file.
+    Yields (start, end) tuples without loading the whole file into memory.
+    """
+    with open(input_file, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                # A blank line ends the ranges section
+                break
+            start, end = line.split('-')
+            yield (int(start), int(end))
+
+
+# Most run files merged at once; more runs are merged in several passes
+MAX_MERGE_FAN_IN = 256
+
+
+def _write_run(pairs, temp_dir, buffer_pairs=65536):
+    """
+    Write sorted (start, end) pairs to a temporary file as packed unsigned
+    64-bit values, buffer_pairs pairs at a time. Returns the path of the run
+    file; the file is removed again if writing fails.
+    """
+    fd, path = tempfile.mkstemp(suffix='.run', dir=temp_dir)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            packed = array('Q')
+            for start, end in pairs:
+                packed.append(start)
+                packed.append(end)
+                if len(packed) >= 2 * buffer_pairs:
+                    packed.tofile(f)
+                    packed = array('Q')
+            packed.tofile(f)
+    except BaseException:
+        # The caller only cleans up runs it received; remove this one here
+        os.remove(path)
+        raise
+
+    return path
+
+
+def _spill_sorted_run(chunk, temp_dir):
+    """
+    Sort a chunk of ranges and write it to a run file with _write_run.
+    Returns the path of the run file.
+    """
+    chunk.sort()
+    return _write_run(chunk, temp_dir)
+
+
+def _read_sorted_run(path, buffer_pairs):
+    """
+    Read a run file written by _spill_sorted_run back as (start, end) tuples,
+    holding at most buffer_pairs pairs in memory at a time.
+    """
+    item_size = array('Q').itemsize
+    with open(path, 'rb') as f:
+        while True:
+            data = f.read(2 * item_size * buffer_pairs)
+            if not data:
+                break
+            packed = array('Q')
+            packed.frombytes(data)
+            for i in range(0, len(packed), 2):
+                yield (packed[i], packed[i + 1])
+
+
+def count_total_fresh_ids_external(ranges, chunk_size=1_000_000, output_file=None,
+                                   temp_dir=None, buffer_pairs=65536, fan_in=MAX_MERGE_FAN_IN):
+    """
+    Count the total number of fresh IDs using an external merge sort.
+
+    Ranges are consumed from any iterable (e.g. iter_ranges) in chunks of
+    chunk_size, each chunk is sorted and spilled to a temporary run file, and
+    the runs are k-way merged with heapq.merge while overlapping/adjacent
+    ranges are coalesced. At most fan_in runs are merged at once: with more
+    runs, the oldest fan_in are merged into an intermediate run file until
+    few enough remain. Memory use is bounded by chunk_size plus fan_in read
+    buffers, and at most fan_in + 1 files are open at a time. Range bounds
+    must be non-negative and fit in 64 bits.
+
+    If output_file is given, the merged ranges are written to it as
+    'start-end' lines while counting.
+    """
+    if fan_in < 2:
+        raise ValueError("fan_in must be at least 2")
+
+    run_paths = []
+    try:
+        chunk = []
+        for current_range in ranges:
+            chunk.append(current_range)
+            if len(chunk) >= chunk_size:
+                run_paths.append(_spill_sorted_run(chunk, temp_dir))
+                chunk = []
+        if chunk:
+            run_paths.append(_spill_sorted_run(chunk, temp_dir))
+
+        while len(run_paths) > fan_in:
+            group = run_paths[:fan_in]
+            runs = [_read_sorted_run(path, buffer_pairs) for path in group]
+            run_paths.append(_write_run(coalesce_sorted_ranges(heapq.merge(*runs)), temp_dir, buffer_pairs))
+            for path in group:
+                os.remove(path)
+            del run_paths[:fan_in]
+
+        runs = [_read_sorted_run(path, buffer_pairs) for path in run_paths]
+        merged = coalesce_sorted_ranges(heapq.merge(*runs))
+
+        total = 0
+        if output_file is None:
+            for start, end in merged:
+                total += end - start + 1
+        else:
+            with open(output_file, 'w') as out:
+                for start, end in merged:
+                    out.write(f"{start}-{end}\n")
+                    total += end - start + 1
+
+        return total
+    finally:
+        for path in run_paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+
 def solve_part1(input_file):
     """
     Solve Part 1: Count how many available ingredient IDs are fresh.
@@ -97,16 +363,25 @@ def solve_part1(input_file):
     return fresh_count
 
 
-def solve_part2(input_file):
+def solve_part2(input_file, workers=1):
     """
     Solve Part 2: Count the total number of ingredient IDs considered fresh
     by the ranges (regardless of available inventory).
     """
     ranges, _ = parse_input(input_file)
-    total_fresh = count_total_fresh_ids(ranges)
+    total_fresh = count_total_fresh_ids(ranges, workers=workers)
     return total_fresh
 
 
+def solve_part2_external(input_file, chunk_size=1_000_000, output_file=None):
+    """
+    Solve Part 2 for range files too large to hold in memory, streaming the
+    ranges from disk through count_total_fresh_ids_external.
+    """
+    return count_total_fresh_ids_external(iter_ranges(input_file), chunk_size=chunk_size,
+                                          output_file=output_file)
+
+
 if __name__ == "__main__":
     print("Part 1:")
     result1 = solve_part1("input.txt")
@@ -1,6 +1,9 @@
 import unittest
 import os
 from solution import parse_input, is_fresh, count_fresh_ingredients, solve_part1, merge_ranges, count_total_fresh_ids, solve_part2
+from solution import FreshRangeIndex
+from solution import choose_split_points, partition_ranges, merge_ranges_parallel
+from solution import iter_ranges, coalesce_sorted_ranges, count_total_fresh_ids_external, solve_part2_external
 
 
 class TestCafeteria(unittest.TestCase):
@@ -309,5 +312,184 @@ class TestCafeteria(unittest.TestCase):
             self.assertEqual(result, 358155203664116)
 
 
+    # External-memory merge tests
+    def test_iter_ranges_example(self):
+        """Test streaming ranges stops at the blank line."""
+        test_file = "test_input_iter.txt"
+        with open(test_file, 'w') as f:
+            f.write("3-5\n10-14\n16-20\n12-18\n\n1\n5\n")
+
+        self.assertEqual(list(iter_ranges(test_file)), [(3, 5), (10, 14), (16, 20), (12, 18)])
+
+        os.remove(test_file)
+
+    def test_coalesce_sorted_ranges(self):
+        """Test coalescing already sorted ranges, including adjacency."""
+        ranges = [(1, 3), (4, 6), (6, 8), (10, 12), (11, 11)]
+        self.assertEqual(list(coalesce_sorted_ranges(ranges)), [(1, 8), (10, 12)])
+        self.assertEqual(list(coalesce_sorted_ranges([])), [])
+
+    def test_count_total_fresh_ids_external_example(self):
+        """Test the external merge on the example with tiny spill chunks."""
+        ranges = [(3, 5), (10, 14), (16, 20), (12, 18)]
+        self.assertEqual(count_total_fresh_ids_external(ranges, chunk_size=1), 14)
+        self.assertEqual(count_total_fresh_ids_external(ranges, chunk_size=3), 14)
+
+    def test_count_total_fresh_ids_external_empty(self):
+        """Test the external merge with no ranges."""
+        self.assertEqual(count_total_fresh_ids_external([]), 0)
+
+    def test_count_total_fresh_ids_external_matches_in_memory(self):
+        """Test the external merge agrees with the in-memory merge."""
+        ranges = [((i * 37) % 101, (i * 37) % 101 + i % 7) for i in range(200)]
+        ranges.append((2 ** 63, 2 ** 64 - 1))
+        expected = count_total_fresh_ids(ranges)
+        self.assertEqual(count_total_fresh_ids_external(ranges, chunk_size=16, buffer_pairs=5), expected)
+
+    def test_count_total_fresh_ids_external_cleans_up_on_error(self):
+        """Test a failed spill leaves no run files behind."""
+        temp_dir = "test_spill_runs"
+        os.mkdir(temp_dir)
+        ranges = [(1, 2), (3, 4), (5, 6), (-1, 5)]
+
+        with self.assertRaises(OverflowError):
+            count_total_fresh_ids_external(ranges, chunk_size=2, temp_dir=temp_dir)
+        self.assertEqual(os.listdir(temp_dir), [])
+
+        os.rmdir(temp_dir)
+
+    def test_count_total_fresh_ids_external_multi_pass(self):
+        """Test merging more runs than the fan-in takes several passes."""
+        temp_dir = "test_multi_pass_runs"
+        os.mkdir(temp_dir)
+        ranges = [((i * 7919) % 1000, (i * 7919) % 1000 + i % 5) for i in range(300)]
+        expected = count_total_fresh_ids(ranges)
+
+        for fan_in in (2, 3, 16):
+            total = count_total_fresh_ids_external(ranges, chunk_size=4, temp_dir=temp_dir,
+                                                   buffer_pairs=3, fan_in=fan_in)
+            self.assertEqual(total, expected)
+            self.assertEqual(os.listdir(temp_dir), [])
+
+        os.rmdir(temp_dir)
+
+    def test_count_total_fresh_ids_external_rejects_small_fan_in(self):
+        """Test a fan-in below two is rejected."""
+        with self.assertRaises(ValueError):
+            count_total_fresh_ids_external([(1, 2)], fan_in=1)
+
+    def test_count_total_fresh_ids_external_output_file(self):
+        """Test the external merge writes the merged ranges."""
+        output_file = "test_merged_ranges.txt"
+        ranges = [(3, 5), (10, 14), (16, 20), (12, 18)]
+
+        total = count_total_fresh_ids_external(ranges, chunk_size=2, output_file=output_file)
+        with open(output_file, 'r') as f:
+            lines = f.read().split()
+
+        self.assertEqual(total, 14)
+        self.assertEqual(lines, ["3-5", "10-20"])
+
+        os.remove(output_file)
+
+    def test_solve_part2_external_example(self):
+        """Test external Part 2 with the example from the problem."""
+        test_file = "test_input_external.txt"
+        with open(test_file, 'w') as f:
+            f.write("3-5\n10-14\n16-20\n12-18\n\n1\n5\n8\n11\n17\n32")
+
+        self.assertEqual(solve_part2_external(test_file, chunk_size=2), 14)
+
+        os.remove(test_file)
+
+    def test_actual_input_part2_external(self):
+        """Test external Part 2 agrees with the in-memory answer."""
+        if os.path.exists("input.txt"):
+            result = solve_part2_external("input.txt", chunk_size=50)
+            self.assertEqual(result, 358155203664116)
+
+
+    # Parallel merge tests
+    def test_choose_split_points(self):
+        """Test split points are sorted, distinct and inside the key space."""
+        ranges = [(i * 10, i * 10 + 5) for i in range(100)]
+        splits = choose_split_points(ranges, 4)
+        self.assertEqual(splits, sorted(set(splits)))
+        self.assertEqual(len(splits), 3)
+        self.assertTrue(all(0 < split < 1000 for split in splits))
+        self.assertEqual(choose_split_points(ranges, 1), [])
+
+    def test_partition_ranges_clips_straddling(self):
+        """Test ranges straddling split points are clipped per partition."""
+        partitions = partition_ranges([(1, 25), (12, 14), (30, 30)], [10, 20])
+        self.assertEqual(partitions, [[(1, 9)], [(10, 19), (12, 14)], [(20, 25), (30, 30)]])
+
+    def test_merge_ranges_parallel_example(self):
+        """Test the parallel merge stitches boundaries back together."""
+        ranges = [(3, 5), (10, 14), (16, 20), (12, 18)]
+        self.assertEqual(merge_ranges_parallel(ranges, 2), [(3, 5), (10, 20)])
+        self.assertEqual(merge_ranges(ranges, workers=3), [(3, 5), (10, 20)])
+
+    def test_parallel_matches_serial(self):
+        """Test the parallel mode gives the exact serial answers."""
+        ranges = [((i * 7919) % 1000, (i * 7919) % 1000 + i % 50) for i in range(500)]
+        ranges.append((0, 2000))
+        ranges.append((5000, 5000))
+        self.assertEqual(merge_ranges(ranges, workers=4), merge_ranges(ranges))
+        self.assertEqual(count_total_fresh_ids(ranges, workers=4), count_total_fresh_ids(ranges))
+
+    def test_count_total_fresh_ids_parallel_empty(self):
+        """Test the parallel mode with no ranges."""
+        self.assertEqual(count_total_fresh_ids([], workers=4), 0)
+        self.assertEqual(merge_ranges([], workers=4), [])
+
+    def test_actual_input_part2_parallel(self):
+        """Test parallel Part 2 agrees with the serial answer."""
+        if os.path.exists("input.txt"):
+            result = solve_part2("input.txt", workers=4)
+            self.assertEqual(result, 358155203664116)
+
+
+    # Range query index tests
+    def test_fresh_range_index_example(self):
+        """Test window counts over the example ranges."""
+        index = FreshRangeIndex([(3, 5), (10, 14), (16, 20), (12, 18)])
+        self.assertEqual(index.count_in_window(0, 100), 14)
+        self.assertEqual(index.count_in_window(3, 5), 3)
+        self.assertEqual(index.count_in_window(4, 11), 4)
+        self.assertEqual(index.count_in_window(6, 9), 0)
+        self.assertEqual(index.count_in_window(20, 20), 1)
+        self.assertEqual(index.count_in_window(21, 30), 0)
+        self.assertEqual(index.count_in_window(5, 4), 0)
+
+    def test_fresh_range_index_empty(self):
+        """Test an index with no ranges."""
+        index = FreshRangeIndex([])
+        self.assertEqual(index.count_in_window(0, 100), 0)
+        self.assertFalse(index.contains(5))
+
+    def test_fresh_range_index_matches_brute_force(self):
+        """Test window counts agree with per-ID membership checks."""
+        ranges = [(2, 4), (7, 7), (9, 15), (13, 20), (25, 30)]
+        index = FreshRangeIndex(ranges)
+        for a in range(0, 33):
+            for b in range(a, 33):
+                expected = sum(1 for x in range(a, b + 1) if is_fresh(x, ranges))
+                self.assertEqual(index.count_in_window(a, b), expected)
+
+    def test_fresh_range_index_batch(self):
+        """Test the batch window query."""
+        index = FreshRangeIndex([(3, 5), (10, 14), (16, 20), (12, 18)])
+        self.assertEqual(index.count_in_windows([(0, 100), (4, 11), (6, 9)]), [14, 4, 0])
+        self.assertEqual(index.count_in_windows([]), [])
+
+    def test_fresh_range_index_contains(self):
+        """Test membership through the index matches is_fresh."""
+        ranges = [(3, 5), (10, 14), (16, 20), (12, 18)]
+        index = FreshRangeIndex(ranges)
+        for ingredient_id in range(0, 25):
+            self.assertEqual(index.contains(ingredient_id), is_fresh(ingredient_id, ranges))
+
+
 if __name__ == "__main__":
     unittest.main(verbosity=2)
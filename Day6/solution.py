@@ -1,7 +1,15 @@
-def parse_worksheet(input_file):
+import math
+import re
+
+
+# Maps every byte to 1 except space, which maps to 0
+_OCCUPIED_TABLE = bytes(0 if b == ord(' ') else 1 for b in range(256))
+
+
+def read_worksheet(input_file):
     """
-    Parse the math worksheet into individual problems.
-    Returns a list of (numbers, operation) tuples.
+    Read the worksheet and pad every row to the same width.
+    Returns (number_lines, operations_line); both are empty when the file is blank.
     """
     with open(input_file, 'r') as f:
         lines = [line.rstrip('\n') for line in f]
@@ -11,84 +19,161 @@ def parse_worksheet(input_file):
         lines.pop()
 
     if not lines:
-        return []
+        return [], ''
+
+    # Find the width of the worksheet and pad all lines to it
+    max_width = max(len(line) for line in lines)
+    padded_lines = [line.ljust(max_width) for line in lines]
 
     # The last line contains operations
-    operations_line = lines[-1]
-    number_lines = lines[:-1]
+    return padded_lines[:-1], padded_lines[-1]
+
+
+def find_problem_spans(number_lines, operations_line):
+    """
+    Find the column spans of the problems on a padded worksheet.
+    The occupied-column mask is built in a single pass over the rows by OR-ing
+    each row's 0/1 occupancy bytes together as one big integer; problems are
+    the maximal runs of occupied columns.
+    Returns a list of (start_col, end_col) tuples, end_col exclusive.
+    """
+    width = len(operations_line)
+    if width == 0:
+        return []
+
+    mask = 0
+    for line in number_lines + [operations_line]:
+        mask |= int.from_bytes(line.encode().translate(_OCCUPIED_TABLE), 'big')
+
+    # Every byte of the mask is still 0 or 1, so runs of 0x01 are problem spans
+    mask_bytes = mask.to_bytes(width, 'big')
+    return [match.span() for match in re.finditer(b'\x01+', mask_bytes)]
 
-    # Find the width of the worksheet
-    max_width = max(len(line) for line in lines)
 
-    # Pad all lines to the same width
-    padded_lines = []
+def tokenize_worksheet(input_file):
+    """
+    Read the worksheet once and locate its problems.
+    Returns (number_lines, operations_line, spans) shared by both readers.
+    """
+    number_lines, operations_line = read_worksheet(input_file)
+    spans = find_problem_spans(number_lines, operations_line)
+    return number_lines, operations_line, spans
+
+
+def read_problem_ltr(number_lines, operations_line, start_col, end_col):
+    """
+    Read one problem span row by row (Part 1).
+    Returns a (numbers, operation) tuple.
+    """
+    numbers = []
     for line in number_lines:
-        padded_lines.append(line.ljust(max_width))
-    operations_line = operations_line.ljust(max_width)
+        num_str = line[start_col:end_col].strip()
+        if num_str:
+            numbers.append(int(num_str))
 
-    # Identify columns (problems are separated by full columns of spaces)
-    problems = []
-    col = 0
+    operation = operations_line[start_col:end_col].strip()
+    return numbers, operation
 
-    while col < max_width:
-        # Skip spaces
-        while col < max_width and all(line[col] == ' ' for line in padded_lines) and operations_line[col] == ' ':
-            col += 1
 
-        if col >= max_width:
-            break
+def read_problem_rtl(number_lines, operations_line, start_col, end_col):
+    """
+    Read one problem span column by column from right to left (Part 2).
+    Each column is a number with the most significant digit at the top.
+    Returns a (numbers, operation) tuple.
+    """
+    numbers = []
+    for c in range(end_col - 1, start_col - 1, -1):
+        # Read vertically down this column to build the number
+        digits = ''.join(line[c] for line in number_lines).replace(' ', '')
+        if digits:
+            numbers.append(int(digits))
 
-        # Found start of a problem - find its width
-        start_col = col
-        while col < max_width and not (all(line[col] == ' ' for line in padded_lines) and operations_line[col] == ' '):
-            col += 1
-        end_col = col
+    operation = operations_line[start_col:end_col].strip()
+    return numbers, operation
 
-        # Extract this problem
-        numbers = []
-        for line in padded_lines:
-            num_str = line[start_col:end_col].strip()
-            if num_str:
-                numbers.append(int(num_str))
 
-        operation = operations_line[start_col:end_col].strip()
+def parse_worksheet(input_file):
+    """
+    Parse the math worksheet into individual problems.
+    Returns a list of (numbers, operation) tuples.
+    """
+    number_lines, operations_line, spans = tokenize_worksheet(input_file)
 
+    problems = []
+    for start_col, end_col in spans:
+        numbers, operation = read_problem_ltr(number_lines, operations_line, start_col, end_col)
         if numbers and operation:
             problems.append((numbers, operation))
 
     return problems
 
 
-def solve_problem(numbers, operation):
+# Below this many operands math.prod's left-to-right loop is already fastest
+PRODUCT_TREE_THRESHOLD = 16
+
+
+def product_tree(numbers):
+    """
+    Multiply numbers with a balanced pairwise reduction.
+    Operands stay similar in size at every level, so big-integer products
+    cost far less than a left-to-right running product. Returns 1 for no numbers.
+    """
+    values = list(numbers)
+    while len(values) > 1:
+        paired = [values[i] * values[i + 1] for i in range(0, len(values) - 1, 2)]
+        if len(values) % 2:
+            paired.append(values[-1])
+        values = paired
+
+    return values[0] if values else 1
+
+
+def solve_problem(numbers, operation, modulus=None):
     """
     Solve a single math problem.
     numbers: list of integers to combine
     operation: either '*' or '+'
+    modulus: if given, the result is reduced modulo this number (for checksums),
+    keeping every intermediate value small
     """
     if not numbers:
         return 0
 
-    result = numbers[0]
-    for num in numbers[1:]:
-        if operation == '*':
-            result *= num
-        elif operation == '+':
-            result += num
+    if operation == '+':
+        result = sum(numbers)
+    elif operation == '*':
+        if modulus is not None:
+            result = 1
+            for num in numbers:
+                result = result * num % modulus
+        elif len(numbers) < PRODUCT_TREE_THRESHOLD:
+            result = math.prod(numbers)
+        else:
+            result = product_tree(numbers)
+    else:
+        result = numbers[0]
+
+    if modulus is not None:
+        result %= modulus
 
     return result
 
 
-def solve_part1(input_file):
+def solve_part1(input_file, modulus=None):
     """
     Solve Part 1: Calculate the grand total of all problems on the worksheet.
+    If modulus is given, the grand total is computed modulo it.
     """
     problems = parse_worksheet(input_file)
 
     grand_total = 0
     for numbers, operation in problems:
-        answer = solve_problem(numbers, operation)
+        answer = solve_problem(numbers, operation, modulus)
         grand_total += answer
 
+    if modulus is not None:
+        grand_total %= modulus
+
     return grand_total
 
 
@@ -98,87 +183,224 @@ def parse_worksheet_rtl(input_file):
     Each number is read column-by-column with the most significant digit at the top.
     Returns a list of (numbers, operation) tuples.
     """
-    with open(input_file, 'r') as f:
-        lines = [line.rstrip('\n') for line in f]
+    number_lines, operations_line, spans = tokenize_worksheet(input_file)
 
-    # Remove any trailing empty lines
-    while lines and not lines[-1].strip():
-        lines.pop()
+    problems = []
+    for start_col, end_col in spans:
+        numbers, operation = read_problem_rtl(number_lines, operations_line, start_col, end_col)
+        if numbers and operation:
+            problems.append((numbers, operation))
 
-    if not lines:
-        return []
+    return problems
 
-    # The last line contains operations
-    operations_line = lines[-1]
-    number_lines = lines[:-1]
 
-    # Find the width of the worksheet
-    max_width = max(len(line) for line in lines)
+def decode_column_numbers(number_lines):
+    """
+    Decode every column of the number rows as a top-to-bottom number in one go.
+    The rows are transposed once with zip, and each column string has its
+    spaces removed before a single int() call, so no per-character Python
+    loop is needed. Returns a list with one entry per column: the number, or
+    None for a column without digits.
+    """
+    columns = (''.join(column).replace(' ', '') for column in zip(*number_lines))
+    return [int(digits) if digits else None for digits in columns]
 
-    # Pad all lines to the same width
-    padded_lines = []
-    for line in number_lines:
-        padded_lines.append(line.ljust(max_width))
-    operations_line = operations_line.ljust(max_width)
 
-    # Identify problem columns (problems are separated by full columns of spaces)
+def parse_worksheet_rtl_transposed(input_file):
+    """
+    Parse the math worksheet reading right-to-left using the transposed columns.
+    Equivalent to parse_worksheet_rtl, but every column number is decoded
+    up front by decode_column_numbers and problems just slice that list.
+    Returns a list of (numbers, operation) tuples.
+    """
+    number_lines, operations_line, spans = tokenize_worksheet(input_file)
+    column_numbers = decode_column_numbers(number_lines)
+
     problems = []
-    col = 0
-
-    while col < max_width:
-        # Skip spaces
-        while col < max_width and all(line[col] == ' ' for line in padded_lines) and operations_line[col] == ' ':
-            col += 1
-
-        if col >= max_width:
-            break
-
-        # Found start of a problem - find its width
-        start_col = col
-        while col < max_width and not (all(line[col] == ' ' for line in padded_lines) and operations_line[col] == ' '):
-            col += 1
-        end_col = col
-
-        # Extract this problem reading RIGHT-TO-LEFT
-        # Each column within the problem is a separate number
-        numbers = []
-
-        # Process each column from right to left
-        for c in range(end_col - 1, start_col - 1, -1):
-            # Read vertically down this column to build the number
-            digits = []
-            for line in padded_lines:
-                if c < len(line) and line[c] != ' ':
-                    digits.append(line[c])
-
-            if digits:
-                # The digits are already in order (top to bottom = most to least significant)
-                number = int(''.join(digits))
-                numbers.append(number)
-
-        # Get the operation (should be consistent across the problem width)
+    for start_col, end_col in spans:
+        numbers = [n for n in reversed(column_numbers[start_col:end_col]) if n is not None]
         operation = operations_line[start_col:end_col].strip()
-
         if numbers and operation:
             problems.append((numbers, operation))
 
     return problems
 
 
-def solve_part2(input_file):
+def solve_part2(input_file, modulus=None):
     """
     Solve Part 2: Calculate the grand total reading problems right-to-left.
+    If modulus is given, the grand total is computed modulo it.
     """
     problems = parse_worksheet_rtl(input_file)
 
     grand_total = 0
     for numbers, operation in problems:
-        answer = solve_problem(numbers, operation)
+        answer = solve_problem(numbers, operation, modulus)
         grand_total += answer
 
+    if modulus is not None:
+        grand_total %= modulus
+
     return grand_total
 
 
+def solve_both(input_file, modulus=None):
+    """
+    Solve both parts from a single read and tokenization of the worksheet.
+    Each problem span is evaluated row-wise (Part 1) and column-wise
+    right-to-left (Part 2) in the same loop.
+    If modulus is given, both totals are computed modulo it.
+    Returns (part1_total, part2_total).
+    """
+    number_lines, operations_line, spans = tokenize_worksheet(input_file)
+
+    part1_total = 0
+    part2_total = 0
+    for start_col, end_col in spans:
+        numbers, operation = read_problem_ltr(number_lines, operations_line, start_col, end_col)
+        if numbers and operation:
+            part1_total += solve_problem(numbers, operation, modulus)
+
+        numbers, operation = read_problem_rtl(number_lines, operations_line, start_col, end_col)
+        if numbers and operation:
+            part2_total += solve_problem(numbers, operation, modulus)
+
+    if modulus is not None:
+        part1_total %= modulus
+        part2_total %= modulus
+
+    return part1_total, part2_total
+
+
+def scan_row_offsets(input_file, block_size=1 << 20):
+    """
+    Locate every row of the worksheet without holding a full row in memory.
+    Reads the file in fixed-size blocks and records where each line starts.
+    A carriage return before the newline (CRLF files) is not counted in the
+    row's length. Trailing blank rows are dropped. Returns a list of
+    (offset, length) tuples.
+    """
+    rows = []
+    line_start = 0
+    has_content = False
+    position = 0
+    # Last byte of the previous block, for a CRLF split across blocks
+    previous_byte = b''
+
+    with open(input_file, 'rb') as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+
+            start = 0
+            while True:
+                newline = block.find(b'\n', start)
+                segment_end = newline if newline != -1 else len(block)
+                if block[start:segment_end].strip():
+                    has_content = True
+                if newline == -1:
+                    break
+
+                line_end = position + newline
+                length = line_end - line_start
+                before = block[newline - 1:newline] if newline > 0 else previous_byte
+                if before == b'\r' and length > 0:
+                    length -= 1
+                rows.append((line_start, length, has_content))
+                line_start = line_end + 1
+                has_content = False
+                start = newline + 1
+
+            position += len(block)
+            previous_byte = block[-1:]
+
+    # Final line without a trailing newline
+    if position > line_start:
+        length = position - line_start
+        if previous_byte == b'\r':
+            length -= 1
+        rows.append((line_start, length, has_content))
+
+    # Remove any trailing empty lines
+    while rows and not rows[-1][2]:
+        rows.pop()
+
+    return [(offset, length) for offset, length, _ in rows]
+
+
+def iter_problem_bands(input_file, window=1 << 16):
+    """
+    Stream the problems of a very wide worksheet in column windows.
+    Every row is read window bytes at a time by seeking to its offset, so
+    memory is bounded by rows x (window + widest problem) regardless of width.
+    A problem is emitted as soon as a blank separator column follows it; a
+    problem touching the right edge of a window is carried into the next one.
+    Yields (number_rows, operations_row) cut to the problem's own columns.
+    """
+    rows = scan_row_offsets(input_file)
+    if not rows:
+        return
+
+    width = max(length for _, length in rows)
+    carry = [''] * len(rows)
+
+    with open(input_file, 'rb') as f:
+        for window_start in range(0, width, window):
+            window_width = min(window, width - window_start)
+            is_last_window = window_start + window >= width
+
+            band = []
+            for (offset, length), prefix in zip(rows, carry):
+                chunk = ''
+                to_read = min(window_width, length - window_start)
+                if to_read > 0:
+                    f.seek(offset + window_start)
+                    chunk = f.read(to_read).decode()
+                band.append((prefix + chunk).ljust(len(prefix) + window_width))
+
+            number_lines, operations_line = band[:-1], band[-1]
+            band_width = len(operations_line)
+            carry_start = band_width
+
+            for start_col, end_col in find_problem_spans(number_lines, operations_line):
+                if end_col == band_width and not is_last_window:
+                    # The problem may continue in the next window
+                    carry_start = start_col
+                    break
+                yield ([line[start_col:end_col] for line in number_lines],
+                       operations_line[start_col:end_col])
+
+            carry = [line[carry_start:] for line in band]
+
+
+def solve_both_streaming(input_file, window=1 << 16, modulus=None):
+    """
+    Solve both parts for worksheets too wide to hold in memory.
+    Problems come from iter_problem_bands and are evaluated exactly like solve_both,
+    including the optional modulus.
+    Returns (part1_total, part2_total).
+    """
+    part1_total = 0
+    part2_total = 0
+    for number_lines, operations_line in iter_problem_bands(input_file, window):
+        problem_width = len(operations_line)
+
+        numbers, operation = read_problem_ltr(number_lines, operations_line, 0, problem_width)
+        if numbers and operation:
+            part1_total += solve_problem(numbers, operation, modulus)
+
+        numbers, operation = read_problem_rtl(number_lines, operations_line, 0, problem_width)
+        if numbers and operation:
+            part2_total += solve_problem(numbers, operation, modulus)
+
+    if modulus is not None:
+        part1_total %= modulus
+        part2_total %= modulus
+
+    return part1_total, part2_total
+
+
 if __name__ == "__main__":
     print("Part 1:")
     result1 = solve_part1("input.txt")
@@ -1,6 +1,10 @@
 import unittest
 import os
 from solution import parse_worksheet, parse_worksheet_rtl, solve_problem, solve_part1, solve_part2
+from solution import product_tree
+from solution import scan_row_offsets, iter_problem_bands, solve_both_streaming
+from solution import solve_both, decode_column_numbers, parse_worksheet_rtl_transposed
+from solution import find_problem_spans, tokenize_worksheet, read_problem_ltr, read_problem_rtl
 
 
 class TestCephalopodMath(unittest.TestCase):
@@ -447,5 +451,239 @@ class TestCephalopodMath(unittest.TestCase):
             self.assertEqual(result, 7996218225744)
 
 
+    # Tokenizer Tests
+    def test_find_problem_spans_example(self):
+        """Test span detection on the example worksheet."""
+        number_lines = ["123 328  51 64 ", " 45 64  387 23 ", "  6 98  215 314"]
+        operations_line = "*   +   *   +  "
+        spans = find_problem_spans(number_lines, operations_line)
+        self.assertEqual(spans, [(0, 3), (4, 7), (8, 11), (12, 15)])
+
+    def test_find_problem_spans_wide_gaps(self):
+        """Test span detection with several blank columns between problems."""
+        spans = find_problem_spans([" 1    22 "], " +    *  ")
+        self.assertEqual(spans, [(1, 2), (6, 8)])
+
+    def test_find_problem_spans_empty(self):
+        """Test span detection on an empty worksheet."""
+        self.assertEqual(find_problem_spans([], ''), [])
+
+    def test_tokenize_worksheet_shared_spans(self):
+        """Test both readers decode the same spans from one tokenization."""
+        test_file = "test_tokenize.txt"
+        example_input = """123 328  51 64
+ 45 64  387 23
+  6 98  215 314
+*   +   *   +"""
+
+        with open(test_file, 'w') as f:
+            f.write(example_input)
+
+        number_lines, operations_line, spans = tokenize_worksheet(test_file)
+        self.assertEqual(len(spans), 4)
+        self.assertEqual(read_problem_ltr(number_lines, operations_line, *spans[0]), ([123, 45, 6], '*'))
+        self.assertEqual(read_problem_rtl(number_lines, operations_line, *spans[0]), ([356, 24, 1], '*'))
+        self.assertEqual(read_problem_rtl(number_lines, operations_line, *spans[3]), ([4, 431, 623], '+'))
+
+        os.remove(test_file)
+
+
+    # Combined evaluation Tests
+    def test_solve_both_example(self):
+        """Test both parts from one parse of the example."""
+        test_file = "test_both.txt"
+        example_input = """123 328  51 64
+ 45 64  387 23
+  6 98  215 314
+*   +   *   +"""
+
+        with open(test_file, 'w') as f:
+            f.write(example_input)
+
+        self.assertEqual(solve_both(test_file), (4277556, 3263827))
+
+        os.remove(test_file)
+
+    def test_solve_both_empty(self):
+        """Test both parts on an empty worksheet."""
+        test_file = "test_both_empty.txt"
+        with open(test_file, 'w') as f:
+            f.write("")
+
+        self.assertEqual(solve_both(test_file), (0, 0))
+
+        os.remove(test_file)
+
+    def test_actual_input_both(self):
+        """Test the combined solver against both actual answers."""
+        if os.path.exists("input.txt"):
+            self.assertEqual(solve_both("input.txt"), (5784380717354, 7996218225744))
+
+
+    # Transposed Reader Tests
+    def test_decode_column_numbers(self):
+        """Test decoding every column, skipping spaces inside a column."""
+        number_lines = ["12 4", " 3 5", "6  6"]
+        self.assertEqual(decode_column_numbers(number_lines), [16, 23, None, 456])
+
+    def test_decode_column_numbers_empty(self):
+        """Test decoding with no number rows."""
+        self.assertEqual(decode_column_numbers([]), [])
+
+    def test_parse_worksheet_rtl_transposed_example(self):
+        """Test the transposed reader matches the column-walking reader."""
+        test_file = "test_rtl_transposed.txt"
+        example_input = """123 328  51 64
+ 45 64  387 23
+  6 98  215 314
+*   +   *   +"""
+
+        with open(test_file, 'w') as f:
+            f.write(example_input)
+
+        problems = parse_worksheet_rtl_transposed(test_file)
+        self.assertEqual(problems, parse_worksheet_rtl(test_file))
+        self.assertEqual(problems[0], ([356, 24, 1], '*'))
+
+        os.remove(test_file)
+
+    def test_actual_input_rtl_transposed(self):
+        """Test the transposed reader against the actual input."""
+        if os.path.exists("input.txt"):
+            self.assertEqual(parse_worksheet_rtl_transposed("input.txt"), parse_worksheet_rtl("input.txt"))
+
+
+    # Streaming Band Tests
+    def test_scan_row_offsets(self):
+        """Test row offsets are found and trailing blank rows dropped."""
+        test_file = "test_offsets.txt"
+        with open(test_file, 'w') as f:
+            f.write("12 3\n4\n+  *\n\n  \n")
+
+        self.assertEqual(scan_row_offsets(test_file), [(0, 4), (5, 1), (7, 4)])
+        self.assertEqual(scan_row_offsets(test_file, block_size=3), [(0, 4), (5, 1), (7, 4)])
+
+        os.remove(test_file)
+
+    def test_scan_row_offsets_crlf(self):
+        """Test carriage returns are excluded from row lengths, across block edges too."""
+        test_file = "test_offsets_crlf.txt"
+        with open(test_file, 'wb') as f:
+            f.write(b"123 45\r\n 6  78\r\n*   + \r")
+
+        for block_size in (1, 2, 7, 1 << 20):
+            self.assertEqual(scan_row_offsets(test_file, block_size=block_size),
+                             [(0, 6), (8, 6), (16, 6)])
+
+        os.remove(test_file)
+
+    def test_solve_both_streaming_crlf(self):
+        """Test the streaming solver agrees with the text readers on a CRLF worksheet."""
+        test_file = "test_streaming_crlf.txt"
+        with open(test_file, 'wb') as f:
+            f.write(b"123 45\r\n 6  78\r\n*   + \r\n")
+
+        self.assertEqual(solve_both(test_file), (861, 183))
+        for window in (2, 3, 1 << 16):
+            self.assertEqual(solve_both_streaming(test_file, window=window), (861, 183))
+
+        os.remove(test_file)
+
+    def test_iter_problem_bands_carries_across_windows(self):
+        """Test problems split by a window edge are carried and reassembled."""
+        test_file = "test_bands.txt"
+        example_input = """123 328  51 64
+ 45 64  387 23
+  6 98  215 314
+*   +   *   +"""
+
+        with open(test_file, 'w') as f:
+            f.write(example_input)
+
+        for window in (1, 2, 5, 100):
+            problems = list(iter_problem_bands(test_file, window))
+            self.assertEqual(len(problems), 4)
+            self.assertEqual(problems[0], (["123", " 45", "  6"], "*  "))
+            self.assertEqual(problems[3], (["64 ", "23 ", "314"], "+  "))
+
+        os.remove(test_file)
+
+    def test_solve_both_streaming_example(self):
+        """Test the streaming solver matches the in-memory solver."""
+        test_file = "test_streaming.txt"
+        example_input = """123 328  51 64
+ 45 64  387 23
+  6 98  215 314
+*   +   *   +"""
+
+        with open(test_file, 'w') as f:
+            f.write(example_input)
+
+        for window in (1, 3, 4, 7, 1 << 16):
+            self.assertEqual(solve_both_streaming(test_file, window), (4277556, 3263827))
+
+        os.remove(test_file)
+
+    def test_solve_both_streaming_empty(self):
+        """Test the streaming solver on an empty worksheet."""
+        test_file = "test_streaming_empty.txt"
+        with open(test_file, 'w') as f:
+            f.write("\n\n")
+
+        self.assertEqual(solve_both_streaming(test_file), (0, 0))
+
+        os.remove(test_file)
+
+    def test_actual_input_streaming(self):
+        """Test the streaming solver against both actual answers."""
+        if os.path.exists("input.txt"):
+            self.assertEqual(solve_both_streaming("input.txt", window=97), (5784380717354, 7996218225744))
+
+
+    # Product Reduction Tests
+    def test_product_tree_matches_running_product(self):
+        """Test the balanced product agrees with a left-to-right product."""
+        for count in (0, 1, 2, 3, 7, 16, 33):
+            numbers = [(i * 7919) % 1000 + 2 for i in range(count)]
+            expected = 1
+            for num in numbers:
+                expected *= num
+            self.assertEqual(product_tree(numbers), expected)
+
+    def test_solve_problem_many_large_operands(self):
+        """Test the product tree path on many big operands."""
+        numbers = [10 ** 50 + i for i in range(40)]
+        expected = 1
+        for num in numbers:
+            expected *= num
+        self.assertEqual(solve_problem(numbers, '*'), expected)
+
+    def test_solve_problem_modulus(self):
+        """Test results reduced modulo a checksum modulus."""
+        modulus = 1_000_000_007
+        numbers = [10 ** 12 + i for i in range(40)]
+        self.assertEqual(solve_problem(numbers, '*', modulus), solve_problem(numbers, '*') % modulus)
+        self.assertEqual(solve_problem(numbers, '+', modulus), sum(numbers) % modulus)
+        self.assertEqual(solve_problem([], '*', modulus), 0)
+
+    def test_solve_both_modulus(self):
+        """Test grand totals computed modulo a number."""
+        test_file = "test_modulus.txt"
+        example_input = """123 328  51 64
+ 45 64  387 23
+  6 98  215 314
+*   +   *   +"""
+
+        with open(test_file, 'w') as f:
+            f.write(example_input)
+
+        self.assertEqual(solve_both(test_file, modulus=1000), (556, 827))
+        self.assertEqual(solve_both_streaming(test_file, window=3, modulus=1000), (556, 827))
+        self.assertEqual(solve_part1(test_file, modulus=1000), 556)
+        self.assertEqual(solve_part2(test_file, modulus=1000), 827)
+
+        os.remove(test_file)
+
+
 if __name__ == "__main__":
     unittest.main(verbosity=2)
@@ -1,3 +1,17 @@
+import heapq
+import math
+import mmap
+import os
+from bisect import bisect_right
+
+
+# A splitter cell: '^' in str rows, its byte value in bytes-like rows
+_SPLITTER_CELLS = ('^', ord('^'))
+
+# Maps '^' to the digit '1' and every other byte to '0'
+_SPLITTER_BIT_TABLE = bytes(ord('1') if b == ord('^') else ord('0') for b in range(256))
+
+
 def parse_manifold(input_file):
     """
     Parse the manifold diagram.
@@ -21,6 +35,95 @@ def parse_manifold(input_file):
     return grid, start_row, start_col
 
 
+class MappedManifold:
+    """
+    Memory-mapped manifold loader for very large grids.
+    The file is mapped read-only, S is located with a single find, and rows
+    are exposed as zero-copy memoryview slices of the mapping, so no per-row
+    strings are allocated. The rows work as a grid for every engine in this
+    module. Use as a context manager, or call close().
+    """
+    def __init__(self, input_file):
+        self.rows = []
+        self.row_starts = []
+        self.start_row = -1
+        self.start_col = -1
+        self._file = open(input_file, 'rb')
+        self._map = None
+        self._view = None
+
+        if os.path.getsize(input_file) == 0:
+            return
+
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+
+        # Locate rows by their newlines
+        size = len(self._map)
+        row_start = 0
+        while row_start < size:
+            row_end = self._map.find(b'\n', row_start)
+            if row_end == -1:
+                row_end = size
+            self.row_starts.append(row_start)
+            self.rows.append(self._view[row_start:row_end])
+            row_start = row_end + 1
+
+        position = self._map.find(b'S')
+        if position != -1:
+            self.start_row = bisect_right(self.row_starts, position) - 1
+            self.start_col = position - self.row_starts[self.start_row]
+
+    def splitter_columns(self):
+        """
+        Build the build_splitter_columns jump table directly from the mapping.
+        """
+        cols = len(self.rows[0]) if self.rows else 0
+        splitter_columns = [[] for _ in range(cols)]
+
+        for row_idx, row_start in enumerate(self.row_starts):
+            row_end = row_start + len(self.rows[row_idx])
+            position = self._map.find(b'^', row_start, row_end)
+            while position != -1:
+                splitter_columns[position - row_start].append(row_idx)
+                position = self._map.find(b'^', position + 1, row_end)
+
+        return splitter_columns
+
+    def splitter_masks(self):
+        """
+        Build the build_splitter_masks bitsets from the mapped rows.
+        """
+        return build_splitter_masks(self.rows)
+
+    def close(self):
+        """
+        Release the row views, the mapping and the file.
+        Rows still referenced by the caller keep the mapping alive; it is
+        unmapped when the last of them is garbage-collected.
+        """
+        self.rows = []
+        try:
+            if self._view is not None:
+                self._view.release()
+                self._view = None
+            if self._map is not None:
+                try:
+                    self._map.close()
+                except BufferError:
+                    # Exported row views still point into the mapping
+                    pass
+                self._map = None
+        finally:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
 def simulate_beams(grid, start_row, start_col):
     """
     Simulate the tachyon beams through the manifold.
@@ -53,7 +156,7 @@ def simulate_beams(grid, start_row, start_col):
                 continue
 
             # Check what the beam encounters
-            if grid[next_row][col] == '^':
+            if grid[next_row][col] in _SPLITTER_CELLS:
                 # Beam hits a splitter
                 # Only count this split if we haven't already split here
                 if (next_row, col) not in split_positions:
@@ -77,6 +180,53 @@ def simulate_beams(grid, start_row, start_col):
     return total_splits
 
 
+def build_splitter_masks(grid):
+    """
+    Encode each row's splitter positions as a big-int bitset.
+    Bit c of a row's mask is set when column c holds a splitter.
+    """
+    masks = []
+    for row in grid:
+        raw = row.encode() if isinstance(row, str) else bytes(row)
+        bits = raw.translate(_SPLITTER_BIT_TABLE)
+        # Reverse so that column 0 becomes the least significant bit
+        masks.append(int(bits[::-1], 2) if bits else 0)
+    return masks
+
+
+def simulate_beams_bitset(grid, start_row, start_col, splitter_masks=None):
+    """
+    Simulate the classical beams with the active columns held in one big-int bitset.
+    Each row step is a handful of whole-row bit operations:
+    hits = beams & splitters; beams = (beams & ~splitters) | (hits << 1) | (hits >> 1),
+    and the number of splits in that row is the popcount of hits.
+    Returns the total number of splits, the same as simulate_beams.
+    """
+    rows = len(grid)
+    cols = len(grid[0]) if rows > 0 else 0
+    if start_row < 0 or cols == 0:
+        return 0
+
+    if splitter_masks is None:
+        splitter_masks = build_splitter_masks(grid)
+
+    full_mask = (1 << cols) - 1
+    beams = 1 << start_col
+    total_splits = 0
+
+    for next_row in range(start_row + 1, rows):
+        if not beams:
+            break
+
+        splitters = splitter_masks[next_row]
+        hits = beams & splitters
+        if hits:
+            total_splits += hits.bit_count()
+            beams = ((beams & ~splitters) | (hits << 1) | (hits >> 1)) & full_mask
+
+    return total_splits
+
+
 def solve_part1(input_file):
     """
     Solve Part 1: Count how many times the beam is split.
@@ -118,7 +268,7 @@ def simulate_quantum_particle(grid, start_row, start_col):
                 continue
 
             # Check what the particle encounters
-            if grid[next_row][col] == '^':
+            if grid[next_row][col] in _SPLITTER_CELLS:
                 # Particle hits a splitter - it takes BOTH paths
                 left_col = col - 1
                 right_col = col + 1
@@ -145,15 +295,262 @@ def simulate_quantum_particle(grid, start_row, start_col):
     return total_exited
 
 
-def solve_part2(input_file):
+def _propagate_counts(grid, start_row, start_col, one, normalise=None):
+    """
+    Shared row-array propagation behind sweep_manifold and count_timelines.
+    counts[col] is the number of timelines at that column of the current row;
+    a nonzero count on a splitter is a split and its paths move to the
+    neighbouring columns. one is the unit count (1 or 1.0), and normalise,
+    if given, is applied to every new row array (e.g. a modulo reduction).
+    Returns (total_splits, counts) for the row after the last grid row.
+    """
+    cols = len(grid[0])
+    zero = one - one
+    counts = [zero] * cols
+    counts[start_col] = one
+    total_splits = 0
+
+    for next_row in range(start_row + 1, len(grid)):
+        line = grid[next_row]
+        next_counts = [zero] * cols
+
+        for col, num_paths in enumerate(counts):
+            if not num_paths:
+                continue
+
+            if line[col] in _SPLITTER_CELLS:
+                total_splits += 1
+                if col > 0:
+                    next_counts[col - 1] += num_paths
+                if col + 1 < cols:
+                    next_counts[col + 1] += num_paths
+            else:
+                next_counts[col] += num_paths
+
+        counts = normalise(next_counts) if normalise is not None else next_counts
+
+    return total_splits, counts
+
+
+# Rescale log2-estimate counts once they exceed 2**LOG2_RESCALE_BITS
+LOG2_RESCALE_BITS = 512
+
+
+def count_timelines(grid, start_row, start_col, modulus=None, log2_estimate=False):
+    """
+    Count timelines with a choice of arithmetic, using the row-array sweep.
+    - Default: exact big-int count, the same as simulate_quantum_particle.
+    - modulus: the count modulo this number; every per-cell count stays
+      below modulus, so no big-int arithmetic is needed.
+    - log2_estimate: a float estimate of log2 of the count. Counts are kept
+      as floats and rescaled by 2**-LOG2_RESCALE_BITS whenever they grow too
+      large, so they never overflow. Returns -inf when there are no timelines.
+    """
+    if modulus is not None and log2_estimate:
+        raise ValueError("Choose either modulus or log2_estimate, not both")
+
+    rows = len(grid)
+    cols = len(grid[0]) if rows > 0 else 0
+    if start_row < 0 or cols == 0:
+        return float('-inf') if log2_estimate else 0
+
+    exponent = 0
+    rescale_limit = 2.0 ** LOG2_RESCALE_BITS
+
+    def normalise(next_counts):
+        nonlocal exponent
+        if modulus is not None:
+            return [num_paths % modulus for num_paths in next_counts]
+        if log2_estimate and max(next_counts) > rescale_limit:
+            exponent += LOG2_RESCALE_BITS
+            return [num_paths / rescale_limit for num_paths in next_counts]
+        return next_counts
+
+    one = 1.0 if log2_estimate else 1
+    _, counts = _propagate_counts(grid, start_row, start_col, one, normalise)
+
+    total = sum(counts)
+    if log2_estimate:
+        return math.log2(total) + exponent if total > 0 else float('-inf')
+    if modulus is not None:
+        total %= modulus
+    return total
+
+
+def build_timeline_table(grid, modulus=None):
+    """
+    Reverse dynamic program over the whole grid.
+    table[row][col] is the number of timelines for a particle starting at
+    (row, col), i.e. the value simulate_quantum_particle would return for that
+    start. Rows are filled bottom-up: a particle on the last row exits at
+    once, otherwise it inherits the counts of the cells it moves into.
+    If modulus is given, all counts are kept modulo it.
+    """
+    rows = len(grid)
+    cols = len(grid[0]) if rows > 0 else 0
+    if rows == 0:
+        return []
+
+    table = [None] * rows
+    table[rows - 1] = [1] * cols
+
+    for row in range(rows - 2, -1, -1):
+        below = table[row + 1]
+        line = grid[row + 1]
+        current = [0] * cols
+
+        for col in range(cols):
+            if line[col] in _SPLITTER_CELLS:
+                total = 0
+                if col > 0:
+                    total += below[col - 1]
+                if col + 1 < cols:
+                    total += below[col + 1]
+            else:
+                total = below[col]
+
+            current[col] = total % modulus if modulus is not None else total
+
+        table[row] = current
+
+    return table
+
+
+def count_timelines_batch(grid, starts, modulus=None):
+    """
+    Count timelines for many start positions with one reverse DP.
+    starts: iterable of (row, col) positions. Returns a list of counts.
+    """
+    table = build_timeline_table(grid, modulus)
+    return [table[row][col] for row, col in starts]
+
+
+def solve_part2(input_file, modulus=None):
     """
     Solve Part 2: Count the number of different timelines.
+    If modulus is given, the count is computed modulo it.
     """
     grid, start_row, start_col = parse_manifold(input_file)
+    if modulus is not None:
+        return count_timelines(grid, start_row, start_col, modulus=modulus)
+
     timelines = simulate_quantum_particle(grid, start_row, start_col)
     return timelines
 
 
+def sweep_manifold(grid, start_row, start_col):
+    """
+    Sweep the manifold row by row with one path-count array per row.
+    Each cell is visited once, so a nonzero count on a splitter is counted
+    as exactly one split.
+    Returns (total_splits, total_timelines) from the same sweep.
+    """
+    rows = len(grid)
+    cols = len(grid[0]) if rows > 0 else 0
+    if start_row < 0 or cols == 0:
+        return 0, 0
+
+    total_splits, counts = _propagate_counts(grid, start_row, start_col, 1)
+
+    # Every remaining path exits below the last row
+    return total_splits, sum(counts)
+
+
+def build_splitter_columns(grid):
+    """
+    Build the jump table for a grid: for every column, the sorted list of rows
+    holding a splitter. The next splitter below any position is then one
+    binary search away, and memory is proportional to the number of splitters.
+    """
+    cols = len(grid[0]) if grid else 0
+    splitter_columns = [[] for _ in range(cols)]
+
+    for row_idx, row in enumerate(grid):
+        if isinstance(row, str):
+            splitter = '^'
+        else:
+            # Bytes-like rows such as memoryviews are searched as bytes
+            row, splitter = bytes(row), b'^'
+        col = row.find(splitter)
+        while col != -1:
+            splitter_columns[col].append(row_idx)
+            col = row.find(splitter, col + 1)
+
+    return splitter_columns
+
+
+def sweep_splitters(grid, start_row, start_col, splitter_columns=None):
+    """
+    Sparse sweep that jumps beams directly from splitter to splitter.
+    Path counts are accumulated per splitter cell and splitters are processed
+    in row order with a heap, so the work scales with the number of splitters
+    hit rather than grid height times active beams.
+    Returns (total_splits, total_timelines), the same as sweep_manifold.
+    """
+    rows = len(grid)
+    cols = len(grid[0]) if rows > 0 else 0
+    if start_row < 0 or cols == 0:
+        return 0, 0
+
+    if splitter_columns is None:
+        splitter_columns = build_splitter_columns(grid)
+
+    # Paths arriving at each pending splitter: {(row, col): num_paths}
+    pending = {}
+    queue = []
+    total_exited = 0
+
+    def send_beam(row, col, num_paths):
+        # Follow the beam down from (row, col) to the next splitter, if any
+        nonlocal total_exited
+        splitter_rows = splitter_columns[col]
+        idx = bisect_right(splitter_rows, row)
+        if idx == len(splitter_rows):
+            total_exited += num_paths
+            return
+
+        target = (splitter_rows[idx], col)
+        if target not in pending:
+            pending[target] = 0
+            heapq.heappush(queue, target)
+        pending[target] += num_paths
+
+    send_beam(start_row, start_col, 1)
+    total_splits = 0
+
+    while queue:
+        row, col = heapq.heappop(queue)
+        num_paths = pending.pop((row, col))
+        total_splits += 1
+
+        if col > 0:
+            send_beam(row, col - 1, num_paths)
+        if col + 1 < cols:
+            send_beam(row, col + 1, num_paths)
+
+    return total_splits, total_exited
+
+
+def solve_both(input_file):
+    """
+    Solve both parts from a single sweep of the manifold.
+    Returns (total_splits, total_timelines).
+    """
+    grid, start_row, start_col = parse_manifold(input_file)
+    return sweep_manifold(grid, start_row, start_col)
+
+
+def solve_both_mapped(input_file):
+    """
+    Solve both parts for multi-GB manifolds without per-row strings,
+    running the sparse splitter sweep on the memory-mapped grid.
+    Returns (total_splits, total_timelines).
+    """
+    with MappedManifold(input_file) as manifold:
+        return sweep_splitters(manifold.rows, manifold.start_row, manifold.start_col,
+                               manifold.splitter_columns())
+
+
 if __name__ == "__main__":
     print("Part 1:")
     result1 = solve_part1("input.txt")
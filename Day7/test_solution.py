@@ -1,6 +1,11 @@
 import unittest
 import os
 from solution import parse_manifold, simulate_beams, solve_part1, solve_part2
+from solution import simulate_quantum_particle, sweep_manifold, solve_both
+from solution import build_splitter_columns, sweep_splitters
+from solution import build_splitter_masks, simulate_beams_bitset
+from solution import count_timelines, build_timeline_table, count_timelines_batch
+from solution import MappedManifold, solve_both_mapped
 
 
 class TestLaboratories(unittest.TestCase):
@@ -364,5 +369,378 @@ class TestLaboratories(unittest.TestCase):
             self.assertEqual(result, 231229866702355)
 
 
+    # Row-array sweep tests
+    def test_sweep_manifold_example(self):
+        """Test the row-array sweep computes both parts of the example."""
+        test_file = "test_sweep_example.txt"
+        example = """.......S.......
+...............
+.......^.......
+...............
+......^.^......
+...............
+.....^.^.^.....
+...............
+....^.^...^....
+...............
+...^.^...^.^...
+...............
+..^...^.....^..
+...............
+.^.^.^.^.^...^.
+..............."""
+
+        with open(test_file, 'w') as f:
+            f.write(example)
+
+        grid, start_row, start_col = parse_manifold(test_file)
+        self.assertEqual(sweep_manifold(grid, start_row, start_col), (21, 40))
+        self.assertEqual(solve_both(test_file), (21, 40))
+
+        os.remove(test_file)
+
+    def test_sweep_manifold_edge_splitters(self):
+        """Test the sweep drops branches leaving the grid sideways."""
+        grid = [".S.", "...", ".^.", "...", "^.^"]
+        self.assertEqual(sweep_manifold(grid, 0, 1), (3, 2))
+        self.assertEqual(sweep_manifold(["S...", "....", "^..."], 0, 0), (1, 1))
+
+    def test_sweep_manifold_matches_simulations(self):
+        """Test the sweep agrees with both original simulations."""
+        grid = ["....S....",
+                ".........",
+                "....^....",
+                "...^.^...",
+                "..^...^..",
+                "...^.^...",
+                ".^..^..^.",
+                "........."]
+        splits, timelines = sweep_manifold(grid, 0, 4)
+        self.assertEqual(splits, simulate_beams(grid, 0, 4))
+        self.assertEqual(timelines, simulate_quantum_particle(grid, 0, 4))
+
+    def test_sweep_manifold_start_on_last_row(self):
+        """Test a start on the last row exits immediately."""
+        self.assertEqual(sweep_manifold(["...", ".S."], 1, 1), (0, 1))
+
+    def test_actual_input_both(self):
+        """Test the sweep against both actual answers."""
+        if os.path.exists("input.txt"):
+            self.assertEqual(solve_both("input.txt"), (1672, 231229866702355))
+
+
+    # Sparse splitter sweep tests
+    def test_build_splitter_columns(self):
+        """Test the per-column splitter rows jump table."""
+        grid = ["..S..", ".....", "..^..", ".^.^.", "..^.."]
+        self.assertEqual(build_splitter_columns(grid), [[], [3], [2, 4], [3], []])
+
+    def test_sweep_splitters_example(self):
+        """Test the sparse sweep on the example manifold."""
+        test_file = "test_sparse_example.txt"
+        example = """.......S.......
+...............
+.......^.......
+...............
+......^.^......
+...............
+.....^.^.^.....
+...............
+....^.^...^....
+...............
+...^.^...^.^...
+...............
+..^...^.....^..
+...............
+.^.^.^.^.^...^.
+..............."""
+
+        with open(test_file, 'w') as f:
+            f.write(example)
+
+        grid, start_row, start_col = parse_manifold(test_file)
+        self.assertEqual(sweep_splitters(grid, start_row, start_col), (21, 40))
+
+        os.remove(test_file)
+
+    def test_sweep_splitters_matches_row_sweep(self):
+        """Test the sparse sweep agrees with the row-array sweep."""
+        grids = [
+            [".S.", "...", ".^.", "...", "^.^"],
+            ["S...", "....", "^..."],
+            ["...S...", ".......", "......."],
+            ["....S....", ".........", "....^....", "...^^^...", "..^...^..",
+             "...^.^...", ".^..^..^.", "........."],
+        ]
+        for grid in grids:
+            start_col = grid[0].index('S')
+            self.assertEqual(sweep_splitters(grid, 0, start_col), sweep_manifold(grid, 0, start_col))
+
+    def test_actual_input_sparse(self):
+        """Test the sparse sweep against both actual answers."""
+        if os.path.exists("input.txt"):
+            grid, start_row, start_col = parse_manifold("input.txt")
+            self.assertEqual(sweep_splitters(grid, start_row, start_col), (1672, 231229866702355))
+
+
+    # Bitset beam tests
+    def test_build_splitter_masks(self):
+        """Test column c of a row maps to bit c of its mask."""
+        self.assertEqual(build_splitter_masks(["..S..", "^...^", ".^..."]), [0, 0b10001, 0b00010])
+
+    def test_simulate_beams_bitset_example(self):
+        """Test the bitset simulation on the example manifold."""
+        test_file = "test_bitset_example.txt"
+        example = """.......S.......
+...............
+.......^.......
+...............
+......^.^......
+...............
+.....^.^.^.....
+...............
+....^.^...^....
+...............
+...^.^...^.^...
+...............
+..^...^.....^..
+...............
+.^.^.^.^.^...^.
+..............."""
+
+        with open(test_file, 'w') as f:
+            f.write(example)
+
+        grid, start_row, start_col = parse_manifold(test_file)
+        self.assertEqual(simulate_beams_bitset(grid, start_row, start_col), 21)
+
+        os.remove(test_file)
+
+    def test_simulate_beams_bitset_matches_simulate_beams(self):
+        """Test the bitset simulation agrees with the beam-list simulation."""
+        grids = [
+            [".S.", "...", ".^.", "...", "^.^"],
+            ["S...", "....", "^..."],
+            ["...S", "....", "...^"],
+            ["...S...", ".......", "......."],
+            ["....S....", ".........", "....^....", "...^^^...", "..^...^..",
+             "...^.^...", ".^..^..^.", "........."],
+        ]
+        for grid in grids:
+            start_col = grid[0].index('S')
+            self.assertEqual(simulate_beams_bitset(grid, 0, start_col), simulate_beams(grid, 0, start_col))
+
+    def test_actual_input_bitset(self):
+        """Test the bitset simulation against the actual Part 1 answer."""
+        if os.path.exists("input.txt"):
+            grid, start_row, start_col = parse_manifold("input.txt")
+            self.assertEqual(simulate_beams_bitset(grid, start_row, start_col), 1672)
+
+
+    # Timeline counting mode tests
+    def test_count_timelines_exact(self):
+        """Test the exact mode matches the quantum simulation."""
+        grid = ["....S....", ".........", "....^....", "...^^^...", "..^...^..",
+                "...^.^...", ".^..^..^.", "........."]
+        self.assertEqual(count_timelines(grid, 0, 4), simulate_quantum_particle(grid, 0, 4))
+
+    def test_count_timelines_modulus(self):
+        """Test the modular mode agrees with the exact count."""
+        test_file = "test_timelines_modulus.txt"
+        content = """....S....
+.........
+....^....
+...^.^...
+..^.^.^..
+.^.^.^.^.
+........."""
+
+        with open(test_file, 'w') as f:
+            f.write(content)
+
+        grid, start_row, start_col = parse_manifold(test_file)
+        exact = count_timelines(grid, start_row, start_col)
+        self.assertEqual(exact, 16)
+        self.assertEqual(count_timelines(grid, start_row, start_col, modulus=7), 2)
+        self.assertEqual(solve_part2(test_file, modulus=7), 2)
+
+        os.remove(test_file)
+
+    def test_count_timelines_log2_estimate(self):
+        """Test the log2 estimate, including counts beyond float range."""
+        grid = ["S."] + [".."] * 3
+        self.assertEqual(count_timelines(grid, 0, 0, log2_estimate=True), 0.0)
+
+        # A diamond lattice of splitters grows the count like a binomial sum
+        width = 2401
+        rows = ["." * 1200 + "S" + "." * 1200]
+        for i in range(1, 1200):
+            rows.append("".join('^' if (c + i) % 2 == 0 else '.' for c in range(width)))
+        exact = count_timelines(rows, 0, 1200)
+        estimate = count_timelines(rows, 0, 1200, log2_estimate=True)
+        self.assertGreater(exact.bit_length(), 1024)
+        self.assertAlmostEqual(estimate, exact.bit_length() - 1 + 0.5, delta=0.5)
+
+    def test_count_timelines_no_timelines(self):
+        """Test the log2 estimate when no path survives."""
+        grid = ["S", "^"]
+        self.assertEqual(count_timelines(grid, 0, 0), 0)
+        self.assertEqual(count_timelines(grid, 0, 0, log2_estimate=True), float('-inf'))
+
+    def test_count_timelines_rejects_both_modes(self):
+        """Test modulus and log2 estimate cannot be combined."""
+        with self.assertRaises(ValueError):
+            count_timelines(["S"], 0, 0, modulus=7, log2_estimate=True)
+
+    def test_actual_input_part2_modulus(self):
+        """Test modular Part 2 against the actual answer."""
+        if os.path.exists("input.txt"):
+            modulus = 1_000_000_007
+            self.assertEqual(solve_part2("input.txt", modulus=modulus), 231229866702355 % modulus)
+
+
+    # Reverse DP tests
+    def test_build_timeline_table_small(self):
+        """Test the reverse DP table on a small grid."""
+        grid = [".S.", "...", ".^.", "...", "^.^"]
+        table = build_timeline_table(grid)
+        self.assertEqual(table[4], [1, 1, 1])
+        self.assertEqual(table[3], [1, 1, 1])
+        self.assertEqual(table[1], [1, 2, 1])
+        self.assertEqual(table[0][1], 2)
+
+    def test_build_timeline_table_matches_simulation(self):
+        """Test every start position against the forward simulation."""
+        grid = ["....S....", ".........", "....^....", "...^^^...", "..^...^..",
+                "...^.^...", ".^..^..^.", "........."]
+        table = build_timeline_table(grid)
+        for row in range(len(grid)):
+            for col in range(len(grid[0])):
+                self.assertEqual(table[row][col], simulate_quantum_particle(grid, row, col))
+
+    def test_count_timelines_batch(self):
+        """Test the batch API, including a modulus."""
+        grid = [".S.", "...", ".^.", "...", "^.^"]
+        self.assertEqual(count_timelines_batch(grid, [(0, 1), (0, 0), (4, 2)]), [2, 1, 1])
+        self.assertEqual(count_timelines_batch(grid, [(0, 1)], modulus=2), [0])
+        self.assertEqual(count_timelines_batch([], []), [])
+
+    def test_actual_input_reverse_dp(self):
+        """Test the reverse DP from S against the actual Part 2 answer."""
+        if os.path.exists("input.txt"):
+            grid, start_row, start_col = parse_manifold("input.txt")
+            self.assertEqual(count_timelines_batch(grid, [(start_row, start_col)]), [231229866702355])
+
+
+    # Memory-mapped loader tests
+    def test_mapped_manifold_rows_and_start(self):
+        """Test the mapped loader finds S and exposes rows as views."""
+        test_file = "test_mapped.txt"
+        content = """.......
+..S....
+..^...."""
+
+        with open(test_file, 'w') as f:
+            f.write(content)
+
+        with MappedManifold(test_file) as manifold:
+            self.assertEqual((manifold.start_row, manifold.start_col), (1, 2))
+            self.assertEqual([row.tobytes() for row in manifold.rows], [b".......", b"..S....", b"..^...."])
+            self.assertIsInstance(manifold.rows[0], memoryview)
+
+        os.remove(test_file)
+
+    def test_mapped_manifold_jump_tables(self):
+        """Test the jump tables built from the mapping match the string versions."""
+        test_file = "test_mapped_tables.txt"
+        content = """..S..
+.....
+..^..
+.^.^.
+..^..
+"""
+
+        with open(test_file, 'w') as f:
+            f.write(content)
+
+        grid, _, _ = parse_manifold(test_file)
+        with MappedManifold(test_file) as manifold:
+            self.assertEqual(manifold.splitter_columns(), build_splitter_columns(grid))
+            self.assertEqual(manifold.splitter_masks(), build_splitter_masks(grid))
+
+        os.remove(test_file)
+
+    def test_mapped_manifold_empty_file(self):
+        """Test the mapped loader on an empty file."""
+        test_file = "test_mapped_empty.txt"
+        with open(test_file, 'w') as f:
+            f.write("")
+
+        with MappedManifold(test_file) as manifold:
+            self.assertEqual(manifold.rows, [])
+            self.assertEqual((manifold.start_row, manifold.start_col), (-1, -1))
+        self.assertEqual(solve_both_mapped(test_file), (0, 0))
+
+        os.remove(test_file)
+
+    def test_mapped_rows_as_grid(self):
+        """Test every engine accepts the mapped memoryview rows as a grid."""
+        test_file = "test_mapped_grid.txt"
+        content = """...S...
+.......
+...^...
+..^.^..
+.^...^.
+"""
+
+        with open(test_file, 'w') as f:
+            f.write(content)
+
+        grid, start_row, start_col = parse_manifold(test_file)
+        expected = sweep_manifold(grid, start_row, start_col)
+        with MappedManifold(test_file) as manifold:
+            rows = manifold.rows
+            start = (manifold.start_row, manifold.start_col)
+            self.assertEqual(sweep_manifold(rows, *start), expected)
+            self.assertEqual(sweep_splitters(rows, *start), expected)
+            self.assertEqual(simulate_beams(rows, *start), expected[0])
+            self.assertEqual(simulate_beams_bitset(rows, *start), expected[0])
+            self.assertEqual(simulate_quantum_particle(rows, *start), expected[1])
+            self.assertEqual(count_timelines(rows, *start), expected[1])
+            self.assertEqual(build_timeline_table(rows), build_timeline_table(grid))
+            self.assertEqual(build_splitter_columns(rows), build_splitter_columns(grid))
+            self.assertEqual(build_splitter_masks(rows), build_splitter_masks(grid))
+            del rows
+
+        os.remove(test_file)
+
+    def test_mapped_manifold_close_with_held_row(self):
+        """Test closing while the caller still holds a row view."""
+        test_file = "test_mapped_held.txt"
+        with open(test_file, 'w') as f:
+            f.write("..S..\n..^..\n")
+
+        with MappedManifold(test_file) as manifold:
+            first = manifold.rows[0]
+        self.assertTrue(manifold._file.closed)
+        self.assertEqual(first.tobytes(), b"..S..")
+        del first
+
+        os.remove(test_file)
+
+    def test_actual_input_mapped_rows(self):
+        """Test the dense engines on the mapped rows of the actual input."""
+        if os.path.exists("input.txt"):
+            with MappedManifold("input.txt") as manifold:
+                start = (manifold.start_row, manifold.start_col)
+                self.assertEqual(sweep_manifold(manifold.rows, *start), (1672, 231229866702355))
+                self.assertEqual(sweep_splitters(manifold.rows, *start), (1672, 231229866702355))
+
+    def test_actual_input_mapped(self):
+        """Test the mapped solver against both actual answers."""
+        if os.path.exists("input.txt"):
+            self.assertEqual(solve_both_mapped("input.txt"), (1672, 231229866702355))
+
+
 if __name__ == "__main__":
     unittest.main(verbosity=2)
@@ -1,5 +1,9 @@
+import heapq
 import math
+from array import array
+from bisect import bisect_right
 from collections import defaultdict
+from itertools import islice
 
 
 def parse_junction_boxes(input_file):
@@ -26,20 +30,71 @@ def distance(box1, box2):
     return math.sqrt((x2 - x1)**2 + (y2 - y1)**2 + (z2 - z1)**2)
 
 
+def squared_distance(box1, box2):
+    """
+    Calculate the squared Euclidean distance between two junction boxes.
+    Exact integer, and it orders pairs the same way as distance().
+    """
+    x1, y1, z1 = box1
+    x2, y2, z2 = box2
+    return (x2 - x1)**2 + (y2 - y1)**2 + (z2 - z1)**2
+
+
+def squared_distance_row(junction_boxes, index, others):
+    """
+    Pairwise kernel: exact integer squared distances from box index to every
+    box in others, computed in one list comprehension.
+    """
+    x0, y0, z0 = junction_boxes[index]
+    return [(x - x0)**2 + (y - y0)**2 + (z - z0)**2
+            for x, y, z in (junction_boxes[j] for j in others)]
+
+
+def smallest_edges_blocked(junction_boxes, num_edges, block_size=64):
+    """
+    Exact brute-force selection of the num_edges shortest edges.
+    Pairwise squared distances are computed a block of rows at a time with
+    squared_distance_row, and heapq.nsmallest keeps the running best, so
+    memory stays at O(block_size·n + num_edges) instead of O(n²).
+    Returns (squared_distance, i, j) tuples in ascending order.
+    """
+    n = len(junction_boxes)
+    best = []
+    if num_edges <= 0:
+        return best
+
+    for block_start in range(0, n, block_size):
+        block_edges = []
+        for i in range(block_start, min(block_start + block_size, n)):
+            others = range(i + 1, n)
+            row = squared_distance_row(junction_boxes, i, others)
+            block_edges.extend(zip(row, [i] * len(row), others))
+        best = heapq.nsmallest(num_edges, best + block_edges)
+
+    return best
+
+
 class UnionFind:
     """
     Union-Find data structure for tracking connected components (circuits).
+    Parents and sizes live in array('i') buffers; find is iterative, so long
+    chains cannot hit the recursion limit. The number of components and a
+    multiset of component sizes are maintained on every union.
     """
     def __init__(self, n):
-        self.parent = list(range(n))
-        self.rank = [0] * n
-        self.size = [1] * n
+        self.parent = array('i', range(n))
+        self.size = array('i', [1]) * n
+        self.num_components = n
+        # Multiset of component sizes: {size: number of components with that size}
+        self.size_counts = {1: n} if n > 0 else {}
 
     def find(self, x):
-        """Find the root of the set containing x with path compression."""
-        if self.parent[x] != x:
-            self.parent[x] = self.find(self.parent[x])
-        return self.parent[x]
+        """Find the root of the set containing x with path halving."""
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
 
     def union(self, x, y):
         """
@@ -52,108 +107,593 @@ class UnionFind:
         if root_x == root_y:
             return False
 
-        # Union by rank
-        if self.rank[root_x] < self.rank[root_y]:
-            self.parent[root_x] = root_y
-            self.size[root_y] += self.size[root_x]
-        elif self.rank[root_x] > self.rank[root_y]:
-            self.parent[root_y] = root_x
-            self.size[root_x] += self.size[root_y]
-        else:
-            self.parent[root_y] = root_x
-            self.size[root_x] += self.size[root_y]
-            self.rank[root_x] += 1
+        # Union by size: attach the smaller tree under the larger one
+        if self.size[root_x] < self.size[root_y]:
+            root_x, root_y = root_y, root_x
+
+        size_x = self.size[root_x]
+        size_y = self.size[root_y]
+        self.parent[root_y] = root_x
+        self.size[root_x] = size_x + size_y
+        self.num_components -= 1
+
+        self._remove_size(size_x)
+        self._remove_size(size_y)
+        self.size_counts[size_x + size_y] = self.size_counts.get(size_x + size_y, 0) + 1
 
         return True
 
+    def add(self):
+        """
+        Add a new singleton set and return its element.
+        """
+        x = len(self.parent)
+        self.parent.append(x)
+        self.size.append(1)
+        self.num_components += 1
+        self.size_counts[1] = self.size_counts.get(1, 0) + 1
+        return x
+
+    def _remove_size(self, size):
+        """Remove one component of the given size from the size multiset."""
+        if self.size_counts[size] == 1:
+            del self.size_counts[size]
+        else:
+            self.size_counts[size] -= 1
+
     def get_component_sizes(self):
         """
         Get the sizes of all connected components.
         Returns a list of sizes.
         """
-        component_sizes = defaultdict(int)
-        for i in range(len(self.parent)):
-            root = self.find(i)
-            component_sizes[root] = self.size[root]
+        component_sizes = []
+        for size, count in self.size_counts.items():
+            component_sizes.extend([size] * count)
+
+        return component_sizes
+
+    def largest_component_sizes(self, k):
+        """
+        Get the k largest component sizes in descending order (fewer if there
+        are fewer components). Only the distinct sizes are scanned, never the nodes.
+        """
+        largest = []
+        for size in sorted(self.size_counts, reverse=True):
+            largest.extend([size] * min(self.size_counts[size], k - len(largest)))
+            if len(largest) == k:
+                break
+
+        return largest
+
+
+class SpatialGrid:
+    """
+    Uniform grid hash over junction boxes for nearest-neighbour queries.
+    Boxes are bucketed into cubic cells; a query scans rings of cells around
+    the box's own cell until no unseen box can be closer than the k-th best.
+    Rings are clipped to the occupied cells, and a query that has scanned
+    more cells than there are boxes finishes with a plain scan instead.
+    """
+    def __init__(self, junction_boxes, cell_size=None):
+        self.junction_boxes = junction_boxes
+        if cell_size is None:
+            cell_size = self._default_cell_size(junction_boxes)
+        self.cell_size = cell_size
+
+        self.cells = defaultdict(list)
+        # Bounding box of the occupied cells
+        self._low = None
+        self._high = None
+        # Largest ring radius that can still reach an occupied cell
+        self.max_ring = 0
+        for idx, box in enumerate(junction_boxes):
+            self._add_to_cell(idx, box)
+
+    def _add_to_cell(self, idx, box):
+        """Bucket box idx and grow the occupied bounding box if needed."""
+        cell = self.cell_of(box)
+        self.cells[cell].append(idx)
+
+        if self._low is None:
+            self._low = list(cell)
+            self._high = list(cell)
+        else:
+            for axis in range(3):
+                self._low[axis] = min(self._low[axis], cell[axis])
+                self._high[axis] = max(self._high[axis], cell[axis])
+            self.max_ring = max(high - low for low, high in zip(self._low, self._high))
+
+    def insert(self, box):
+        """
+        Add a new box to the index (appending it to junction_boxes).
+        Returns the new box's index.
+        """
+        idx = len(self.junction_boxes)
+        self.junction_boxes.append(box)
+        self._add_to_cell(idx, box)
+        return idx
+
+    @staticmethod
+    def _default_cell_size(junction_boxes):
+        """
+        Pick a cell size giving roughly one box per cell.
+        Axes along which every box has the same coordinate are ignored, so
+        flat or collinear inputs get cells sized for their real dimension.
+        """
+        if len(junction_boxes) < 2:
+            return 1
+
+        volume = 1
+        dimensions = 0
+        for axis in range(3):
+            coords = [box[axis] for box in junction_boxes]
+            extent = max(coords) - min(coords)
+            if extent > 0:
+                volume *= extent + 1
+                dimensions += 1
+
+        if dimensions == 0:
+            return 1
+        return max(1, round((volume / len(junction_boxes)) ** (1 / dimensions)))
+
+    def cell_of(self, box):
+        """Return the integer cell coordinates containing a box."""
+        return tuple(coord // self.cell_size for coord in box)
+
+    def _ring(self, center, radius):
+        """
+        Yield the cells at Chebyshev distance exactly radius from center,
+        clipped to the bounding box of the occupied cells (cells outside it
+        are always empty, e.g. every z-slice but one for coplanar boxes).
+        """
+        if self._low is None:
+            return
+
+        # Offsets along each axis that stay inside the occupied box
+        bounds = [(max(-radius, low - c), min(radius, high - c))
+                  for c, low, high in zip(center, self._low, self._high)]
+        (x_lo, x_hi), (y_lo, y_hi), (z_lo, z_hi) = bounds
+        cx, cy, cz = center
+
+        def faces(lo, hi):
+            # Offsets on the ring's two faces along an axis, if inside the box
+            return [d for d in {-radius, radius} if lo <= d <= hi]
+
+        y_faces = faces(y_lo, y_hi)
+        z_faces = faces(z_lo, z_hi)
+        if y_faces or z_faces:
+            dxs = range(x_lo, x_hi + 1)
+        else:
+            dxs = faces(x_lo, x_hi)
+
+        for dx in dxs:
+            if abs(dx) == radius:
+                for dy in range(y_lo, y_hi + 1):
+                    for dz in range(z_lo, z_hi + 1):
+                        yield (cx + dx, cy + dy, cz + dz)
+            elif not z_faces:
+                for dy in y_faces:
+                    for dz in range(z_lo, z_hi + 1):
+                        yield (cx + dx, cy + dy, cz + dz)
+            else:
+                for dy in range(y_lo, y_hi + 1):
+                    for dz in (range(z_lo, z_hi + 1) if abs(dy) == radius else z_faces):
+                        yield (cx + dx, cy + dy, cz + dz)
+
+    def _scan_all(self, index):
+        """Return (squared_distance, other_index) for every other box, sorted."""
+        box = self.junction_boxes[index]
+        return sorted((squared_distance(box, other_box), other)
+                      for other, other_box in enumerate(self.junction_boxes) if other != index)
+
+    def nearest(self, index, k):
+        """
+        Find the k nearest boxes to box index.
+        Returns up to k (squared_distance, other_index) tuples in increasing
+        order, ties broken by index.
+        """
+        box = self.junction_boxes[index]
+        center = self.cell_of(box)
+
+        # Max-heap (by negated key) of the k best (squared_distance, index) so far
+        best = []
+        radius = 0
+        cells_scanned = 0
+        while True:
+            if cells_scanned > len(self.junction_boxes):
+                # Mostly empty cells: a plain scan of every box is cheaper
+                return self._scan_all(index)[:k]
+
+            for cell in self._ring(center, radius):
+                cells_scanned += 1
+                for other in self.cells.get(cell, ()):
+                    if other == index:
+                        continue
+                    item = (-squared_distance(box, self.junction_boxes[other]), -other)
+                    if len(best) < k:
+                        heapq.heappush(best, item)
+                    elif item > best[0]:
+                        heapq.heapreplace(best, item)
+
+            if radius >= self.max_ring:
+                break
+
+            # Every unseen box is more than radius cells away along some axis
+            reach = radius * self.cell_size
+            if len(best) == k and -best[0][0] <= reach * reach:
+                break
+            radius += 1
 
-        return list(component_sizes.values())
+        return sorted((-neg_dist, -neg_other) for neg_dist, neg_other in best)
+
+    def within(self, index, max_dist_sq):
+        """
+        Find every other box whose squared distance to box index is at most
+        max_dist_sq. Returns (squared_distance, other_index) tuples in
+        increasing order.
+        """
+        box = self.junction_boxes[index]
+        center = self.cell_of(box)
+
+        found = []
+        radius = 0
+        cells_scanned = 0
+        while True:
+            if cells_scanned > len(self.junction_boxes):
+                # Mostly empty cells: a plain scan of every box is cheaper
+                return [item for item in self._scan_all(index) if item[0] <= max_dist_sq]
+
+            for cell in self._ring(center, radius):
+                cells_scanned += 1
+                for other in self.cells.get(cell, ()):
+                    if other == index:
+                        continue
+                    dist_sq = squared_distance(box, self.junction_boxes[other])
+                    if dist_sq <= max_dist_sq:
+                        found.append((dist_sq, other))
+
+            # Every unseen box is more than radius cells away along some axis
+            reach = radius * self.cell_size
+            if radius >= self.max_ring or reach * reach >= max_dist_sq:
+                break
+            radius += 1
+
+        return sorted(found)
+
+
+def candidate_edges(junction_boxes, k, grid=None):
+    """
+    Collect the k-nearest-neighbour edges of every box.
+    Returns (edges, bound): edges is a sorted list of unique
+    (squared_distance, i, j) tuples with i < j, and every edge missing from
+    it is at least bound long (bound is None when no edge is missing).
+    """
+    if grid is None:
+        grid = SpatialGrid(junction_boxes)
+
+    edges = set()
+    bound = None
+    for i in range(len(junction_boxes)):
+        neighbours = grid.nearest(i, k)
+        if len(neighbours) == k and k < len(junction_boxes) - 1:
+            # Edges from i that were not returned are at least this long
+            kth_dist = neighbours[-1][0]
+            bound = kth_dist if bound is None else min(bound, kth_dist)
+
+        for dist_sq, j in neighbours:
+            edges.add((dist_sq, min(i, j), max(i, j)))
+
+    return sorted(edges), bound
+
+
+def shortest_edges(junction_boxes, num_edges, k=8):
+    """
+    Return the num_edges shortest edges as (squared_distance, i, j) tuples,
+    in the same order as sorting all pairs, without building all pairs.
+    Candidate edges come from k-nearest-neighbour queries on a SpatialGrid;
+    k is doubled until the selected edges are provably the global shortest.
+    """
+    if num_edges <= 0 or len(junction_boxes) < 2:
+        return []
+
+    grid = SpatialGrid(junction_boxes)
+    while True:
+        edges, bound = candidate_edges(junction_boxes, k, grid)
+        selected = edges[:num_edges]
+        if bound is None or (len(selected) == num_edges and selected[-1][0] < bound):
+            return selected
+        k *= 2
+
+
+def iter_edges_ascending(junction_boxes, k=8, grid=None):
+    """
+    Lazily yield every edge as (squared_distance, i, j) in ascending order,
+    the same order as sorting all pairs.
+    Each box keeps a sorted list of its nearest neighbours (from one k-nearest
+    query), and the heads of these lists are merged through a heap. An edge
+    found from both ends has the same key twice, so the two copies pop back
+    to back and the second is dropped. When a box's list runs out, it is
+    refilled from a query with twice the k, so setup costs n queries of size k
+    and consumers that stop early only pay for the lists they drain.
+    """
+    n = len(junction_boxes)
+    if n < 2:
+        return
+
+    if grid is None:
+        grid = SpatialGrid(junction_boxes)
+
+    # Per box: current query size, its sorted (squared_distance, j) list and
+    # whether that list already holds every other box
+    query_sizes = [k] * n
+    neighbour_lists = [None] * n
+    complete = [False] * n
+
+    def fetch(i):
+        neighbour_lists[i] = grid.nearest(i, query_sizes[i])
+        complete[i] = len(neighbour_lists[i]) < query_sizes[i]
+
+    heap = []
+    for i in range(n):
+        fetch(i)
+        dist_sq, j = neighbour_lists[i][0]
+        heap.append((_edge_key(dist_sq, i, j), i, 0))
+    heapq.heapify(heap)
+
+    last_key = None
+    while heap:
+        key, i, pos = heapq.heappop(heap)
+        if key != last_key:
+            yield key
+            last_key = key
+
+        pos += 1
+        if pos == len(neighbour_lists[i]) and not complete[i]:
+            # Refill with a larger query and continue after the entry just popped
+            after = neighbour_lists[i][pos - 1]
+            query_sizes[i] *= 2
+            fetch(i)
+            pos = bisect_right(neighbour_lists[i], after)
+
+        if pos < len(neighbour_lists[i]):
+            dist_sq, j = neighbour_lists[i][pos]
+            heapq.heappush(heap, (_edge_key(dist_sq, i, j), i, pos))
+
+
+def _edge_key(dist_sq, u, v):
+    """Return the (squared_distance, i, j) key of an edge with i < j."""
+    return (dist_sq, u, v) if u < v else (dist_sq, v, u)
+
+
+def euclidean_mst(junction_boxes):
+    """
+    Build the Euclidean minimum spanning tree with Prim's algorithm on the
+    implicit complete graph, keeping only O(n) state: for every box outside
+    the tree, its closest tree box so far. Each step adds the closest outside
+    box and updates the others against it, O(n²) time overall.
+    Edges are compared by (squared_distance, i, j), the order Kruskal uses,
+    so the tree is the one Kruskal would build.
+    Returns the tree edges as (squared_distance, i, j) tuples with i < j.
+    """
+    n = len(junction_boxes)
+    if n < 2:
+        return []
+
+    # Best known edge from each outside box into the tree
+    best_dist = [None] * n
+    best_from = [None] * n
+    remaining = list(range(1, n))
+    newest = 0
+    mst_edges = []
+
+    while remaining:
+        pick_pos = 0
+        pick_key = None
+
+        row = squared_distance_row(junction_boxes, newest, remaining)
+        for pos, (v, dist_sq) in enumerate(zip(remaining, row)):
+            current = best_dist[v]
+            if current is None or dist_sq < current or (
+                    dist_sq == current and _edge_key(dist_sq, newest, v) < _edge_key(current, best_from[v], v)):
+                best_dist[v] = dist_sq
+                best_from[v] = newest
+
+            # Compare full keys only when the distances tie
+            if pick_key is None or best_dist[v] < pick_key[0] or (
+                    best_dist[v] == pick_key[0] and _edge_key(best_dist[v], best_from[v], v) < pick_key):
+                pick_key = _edge_key(best_dist[v], best_from[v], v)
+                pick_pos = pos
+
+        mst_edges.append(pick_key)
+
+        # Move the picked box into the tree (swap-remove keeps this O(1))
+        newest = remaining[pick_pos]
+        remaining[pick_pos] = remaining[-1]
+        remaining.pop()
+
+    return mst_edges
+
+
+# Up to this many boxes the blocked brute-force scan beats the kNN edge stream
+BRUTE_FORCE_MAX_BOXES = 400
+
+
+def select_shortest_edges(junction_boxes, num_edges):
+    """
+    Return the num_edges shortest edges as (squared_distance, i, j) tuples in
+    ascending order, from whichever edge source suits the input: the blocked
+    brute-force selection for small inputs, or when every box sits at the same
+    point (a spatial index cannot separate them), and the lazy kNN stream
+    otherwise. Both give the same edges in the same order.
+    """
+    n = len(junction_boxes)
+    if n <= BRUTE_FORCE_MAX_BOXES or len(set(junction_boxes)) == 1:
+        return smallest_edges_blocked(junction_boxes, num_edges)
+    return islice(iter_edges_ascending(junction_boxes), num_edges)
 
 
 def solve_part1(input_file, num_pairs=1000):
     """
     Solve Part 1: Try to connect the num_pairs closest pairs of junction boxes.
+    The edges come from select_shortest_edges.
     """
     junction_boxes = parse_junction_boxes(input_file)
     n = len(junction_boxes)
 
-    # Create all possible edges with their distances
-    edges = []
-    for i in range(n):
-        for j in range(i + 1, n):
-            dist = distance(junction_boxes[i], junction_boxes[j])
-            edges.append((dist, i, j))
-
-    # Sort edges by distance
-    edges.sort()
+    # Only the num_pairs shortest edges are needed
+    edges = select_shortest_edges(junction_boxes, num_pairs)
 
     # Use Union-Find to connect junction boxes
     # Try to connect the num_pairs closest pairs (some may already be connected)
     uf = UnionFind(n)
 
-    for pair_idx in range(min(num_pairs, len(edges))):
-        dist, i, j = edges[pair_idx]
+    for dist_sq, i, j in edges:
         # Try to connect i and j (may or may not succeed if already connected)
         uf.union(i, j)
 
-    # Get component sizes
-    component_sizes = uf.get_component_sizes()
+    # Multiply the top 3 component sizes (all of them if there are fewer)
+    result = 1
+    for size in uf.largest_component_sizes(3):
+        result *= size
 
-    # Sort in descending order and multiply the top 3
-    component_sizes.sort(reverse=True)
+    return result
 
-    if len(component_sizes) >= 3:
-        result = component_sizes[0] * component_sizes[1] * component_sizes[2]
-    else:
-        result = 1
-        for size in component_sizes:
-            result *= size
 
-    return result
+def connectivity_timeline(junction_boxes, checkpoints):
+    """
+    Answer Part 1 for many num_pairs values in one pass over the edges.
+    Edges are taken once in ascending order from select_shortest_edges (only
+    as many as the largest checkpoint needs) and, after each requested number
+    of attempted connections, the product of the three largest circuits and
+    the number of circuits are recorded.
+    Returns {num_pairs: (product_of_top_3, num_components)}.
+    """
+    uf = UnionFind(len(junction_boxes))
+    pending = sorted(set(checkpoints))
+    timeline = {}
 
+    def record(num_pairs):
+        product = 1
+        for size in uf.largest_component_sizes(3):
+            product *= size
+        timeline[num_pairs] = (product, uf.num_components)
 
-def solve_part2(input_file):
+    # Index of the next checkpoint to record
+    next_idx = 0
+
+    # Checkpoints at or below zero see the untouched circuits
+    while next_idx < len(pending) and pending[next_idx] <= 0:
+        record(pending[next_idx])
+        next_idx += 1
+
+    if next_idx < len(pending):
+        attempted = 0
+        for _, i, j in select_shortest_edges(junction_boxes, pending[-1]):
+            uf.union(i, j)
+            attempted += 1
+            while next_idx < len(pending) and pending[next_idx] == attempted:
+                record(pending[next_idx])
+                next_idx += 1
+
+    # Checkpoints beyond the number of edges see the final circuits
+    for num_pairs in pending[next_idx:]:
+        record(num_pairs)
+
+    return timeline
+
+
+def solve_part1_checkpoints(input_file, checkpoints):
     """
-    Solve Part 2: Connect boxes until all are in one circuit.
-    Return the product of X coordinates of the last two boxes connected.
+    Solve Part 1 for several num_pairs values at once.
+    Returns {num_pairs: product_of_top_3}.
     """
     junction_boxes = parse_junction_boxes(input_file)
-    n = len(junction_boxes)
+    timeline = connectivity_timeline(junction_boxes, checkpoints)
+    return {num_pairs: product for num_pairs, (product, _) in timeline.items()}
 
-    # Create all possible edges with their distances
-    edges = []
-    for i in range(n):
-        for j in range(i + 1, n):
-            dist = distance(junction_boxes[i], junction_boxes[j])
-            edges.append((dist, i, j))
 
-    # Sort edges by distance
-    edges.sort()
+class DynamicCircuits:
+    """
+    Circuits that are kept up to date as junction boxes arrive one at a time.
+    - Threshold circuits: every pair at most threshold_sq apart (squared
+      distance) is connected. On insertion only the new box's neighbours
+      within the threshold are looked up in a SpatialGrid and united.
+    - Part 2: the minimum spanning tree of all boxes so far is updated on
+      every insertion; its longest edge is the last connection that would
+      unify everything.
+    """
+    def __init__(self, threshold_sq, cell_size=None):
+        self.threshold_sq = threshold_sq
+        if cell_size is None:
+            # Neighbours within the threshold are then at most two rings away
+            cell_size = max(1, math.isqrt(threshold_sq))
+        self.grid = SpatialGrid([], cell_size=cell_size)
+        self.junction_boxes = self.grid.junction_boxes
+        self.uf = UnionFind(0)
+        self.mst_edges = []
+        self.longest_edge = None
+
+    def insert(self, box):
+        """
+        Insert a junction box, update the threshold circuits and the MST.
+        Returns the new box's index.
+        """
+        index = self.grid.insert(box)
+        self.uf.add()
 
-    # Use Union-Find to connect junction boxes
-    uf = UnionFind(n)
-    num_components = n  # Start with n separate components
+        for _, other in self.grid.within(index, self.threshold_sq):
+            self.uf.union(index, other)
 
-    last_connection = None
+        self._update_mst(index)
+        return index
 
-    for dist, i, j in edges:
-        # Try to connect i and j
-        if uf.union(i, j):
-            num_components -= 1
-            last_connection = (i, j)
+    def _update_mst(self, index):
+        """
+        Rebuild the MST from the old tree plus the new box's edges.
+        By the cycle property, no other edge can enter the new tree, so
+        Kruskal runs over O(n) edges instead of O(n²).
+        """
+        row = squared_distance_row(self.junction_boxes, index, range(index))
+        candidates = self.mst_edges + [(dist_sq, j, index) for j, dist_sq in enumerate(row)]
+        candidates.sort()
+
+        uf = UnionFind(index + 1)
+        self.mst_edges = [edge for edge in candidates if uf.union(edge[1], edge[2])]
+        self.longest_edge = max(self.mst_edges) if self.mst_edges else None
+
+    def largest_circuits_product(self, k=3):
+        """Product of the k largest threshold circuits (all if fewer)."""
+        product = 1
+        for size in self.uf.largest_component_sizes(k):
+            product *= size
+        return product
+
+    def last_connection_product(self):
+        """
+        Part 2 answer for the boxes inserted so far: the product of the X
+        coordinates of the longest MST edge, or 0 with fewer than two boxes.
+        """
+        if self.longest_edge is None:
+            return 0
+        _, i, j = self.longest_edge
+        return self.junction_boxes[i][0] * self.junction_boxes[j][0]
 
-            # Stop when all boxes are in one circuit
-            if num_components == 1:
-                break
+
+def solve_part2(input_file):
+    """
+    Solve Part 2: Connect boxes until all are in one circuit.
+    Return the product of X coordinates of the last two boxes connected.
+    """
+    junction_boxes = parse_junction_boxes(input_file)
+
+    # The last connection that unifies everything is the longest edge of the
+    # minimum spanning tree (Kruskal adds edges in ascending order)
+    mst_edges = euclidean_mst(junction_boxes)
+
+    last_connection = None
+    if mst_edges:
+        _, i, j = max(mst_edges)
+        last_connection = (i, j)
 
     # Get the X coordinates of the last two boxes connected
     if last_connection:
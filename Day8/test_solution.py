@@ -1,7 +1,13 @@
 import unittest
 import os
 import math
+import random
+import solution
 from solution import parse_junction_boxes, distance, UnionFind, solve_part1, solve_part2
+from solution import squared_distance, SpatialGrid, candidate_edges, shortest_edges
+from solution import iter_edges_ascending, euclidean_mst
+from solution import squared_distance_row, smallest_edges_blocked, select_shortest_edges
+from solution import connectivity_timeline, solve_part1_checkpoints, DynamicCircuits
 
 
 class TestPlayground(unittest.TestCase):
@@ -226,5 +232,383 @@ class TestPlayground(unittest.TestCase):
             self.assertEqual(result, 170629052)
 
 
+    # Spatial index tests
+    def test_squared_distance(self):
+        """Test the exact integer squared distance."""
+        self.assertEqual(squared_distance((0, 0, 0), (3, 4, 0)), 25)
+        self.assertEqual(squared_distance((1, 2, 3), (0, 0, 0)), 14)
+
+    def test_spatial_grid_nearest_matches_brute_force(self):
+        """Test k-nearest queries against sorting every other box."""
+        rng = random.Random(8)
+        boxes = [(rng.randint(0, 1000), rng.randint(0, 1000), rng.randint(-50, 50)) for _ in range(150)]
+        grid = SpatialGrid(boxes)
+        for i in range(0, 150, 7):
+            expected = sorted((squared_distance(boxes[i], boxes[j]), j) for j in range(150) if j != i)
+            for k in (1, 5, 20):
+                self.assertEqual(grid.nearest(i, k), expected[:k])
+
+    def test_spatial_grid_duplicate_points(self):
+        """Test boxes at identical positions are each other's nearest."""
+        boxes = [(5, 5, 5), (5, 5, 5), (100, 100, 100)]
+        grid = SpatialGrid(boxes)
+        self.assertEqual(grid.nearest(0, 1), [(0, 1)])
+        self.assertEqual(grid.nearest(2, 5), [(27075, 0), (27075, 1)])
+
+    def test_spatial_grid_flat_inputs_match_brute_force(self):
+        """Test nearest and radius queries on coplanar and collinear boxes."""
+        rng = random.Random(40)
+        coplanar = [(rng.randint(0, 10 ** 5), rng.randint(0, 10 ** 5), 5) for _ in range(100)]
+        collinear = [(rng.randint(0, 10 ** 5), 7, 5) for _ in range(100)]
+        for boxes in (coplanar, collinear):
+            grid = SpatialGrid(boxes)
+            for i in range(0, 100, 9):
+                expected = sorted((squared_distance(boxes[i], boxes[j]), j) for j in range(100) if j != i)
+                for k in (1, 8, 99):
+                    self.assertEqual(grid.nearest(i, k), expected[:k])
+                limit = expected[10][0]
+                self.assertEqual(grid.within(i, limit), [e for e in expected if e[0] <= limit])
+
+    def test_spatial_grid_cell_size_ignores_flat_axes(self):
+        """Test the default cell size only uses axes the boxes spread along."""
+        boxes = [(x * 100, y * 100, 5) for x in range(10) for y in range(10)]
+        self.assertEqual(SpatialGrid(boxes).cell_size, 90)
+        self.assertEqual(SpatialGrid([(1, 1, 1)] * 4).cell_size, 1)
+
+    def test_candidate_edges_bound(self):
+        """Test every edge missing from the candidates is at least bound long."""
+        rng = random.Random(3)
+        boxes = [(rng.randint(0, 500), rng.randint(0, 500), rng.randint(0, 500)) for _ in range(60)]
+        edges, bound = candidate_edges(boxes, 4)
+        found = {(i, j) for _, i, j in edges}
+        for i in range(60):
+            for j in range(i + 1, 60):
+                if (i, j) not in found:
+                    self.assertGreaterEqual(squared_distance(boxes[i], boxes[j]), bound)
+
+    def test_shortest_edges_matches_full_sort(self):
+        """Test the selected edges are exactly the first edges of the full sort."""
+        rng = random.Random(40)
+        # A tight cluster forces k to grow before the selection is proven exact
+        boxes = [(rng.randint(0, 10), rng.randint(0, 10), rng.randint(0, 10)) for _ in range(40)]
+        boxes += [(rng.randint(0, 10000), rng.randint(0, 10000), rng.randint(0, 10000)) for _ in range(80)]
+        all_edges = sorted((squared_distance(boxes[i], boxes[j]), i, j)
+                           for i in range(len(boxes)) for j in range(i + 1, len(boxes)))
+        for num_edges in (1, 10, 100, 500, len(all_edges) + 5):
+            self.assertEqual(shortest_edges(boxes, num_edges), all_edges[:num_edges])
+
+    def test_shortest_edges_degenerate(self):
+        """Test shortest edges with too few boxes or no edges requested."""
+        self.assertEqual(shortest_edges([], 5), [])
+        self.assertEqual(shortest_edges([(1, 2, 3)], 5), [])
+        self.assertEqual(shortest_edges([(1, 2, 3), (4, 5, 6)], 0), [])
+
+
+    # Lazy edge stream tests
+    def test_iter_edges_ascending_matches_full_sort(self):
+        """Test the lazy stream yields every edge in full-sort order."""
+        rng = random.Random(41)
+        boxes = [(rng.randint(0, 10), rng.randint(0, 10), rng.randint(0, 10)) for _ in range(30)]
+        boxes += [(rng.randint(0, 5000), rng.randint(0, 5000), rng.randint(0, 5000)) for _ in range(50)]
+        all_edges = sorted((squared_distance(boxes[i], boxes[j]), i, j)
+                           for i in range(len(boxes)) for j in range(i + 1, len(boxes)))
+        self.assertEqual(list(iter_edges_ascending(boxes, k=2)), all_edges)
+
+    def test_iter_edges_ascending_coplanar(self):
+        """Test the lazy stream on coplanar boxes, including duplicates."""
+        rng = random.Random(44)
+        boxes = [(rng.randint(0, 3000), rng.randint(0, 3000), 5) for _ in range(70)]
+        boxes += boxes[:5]
+        all_edges = sorted((squared_distance(boxes[i], boxes[j]), i, j)
+                           for i in range(len(boxes)) for j in range(i + 1, len(boxes)))
+        self.assertEqual(list(iter_edges_ascending(boxes, k=2)), all_edges)
+
+    def test_iter_edges_ascending_prefix(self):
+        """Test taking only a prefix of the stream."""
+        boxes = [(0, 0, 0), (10, 0, 0), (0, 10, 0), (1, 1, 1)]
+        stream = iter_edges_ascending(boxes, k=1)
+        self.assertEqual(next(stream), (3, 0, 3))
+        self.assertEqual(next(stream), (83, 1, 3))
+        self.assertEqual(next(stream), (83, 2, 3))
+
+    def test_iter_edges_ascending_degenerate(self):
+        """Test the stream with fewer than two boxes."""
+        self.assertEqual(list(iter_edges_ascending([])), [])
+        self.assertEqual(list(iter_edges_ascending([(1, 2, 3)])), [])
+
+
+    # Euclidean MST tests
+    def test_euclidean_mst_matches_kruskal(self):
+        """Test Prim's tree equals Kruskal's tree, including many distance ties."""
+        rng = random.Random(42)
+        point_sets = [
+            [(rng.randint(0, 3), rng.randint(0, 3), rng.randint(0, 3)) for _ in range(40)],
+            [(rng.randint(0, 1000), rng.randint(0, 1000), rng.randint(0, 1000)) for _ in range(60)],
+        ]
+        for boxes in point_sets:
+            edges = sorted((squared_distance(boxes[i], boxes[j]), i, j)
+                           for i in range(len(boxes)) for j in range(i + 1, len(boxes)))
+            uf = UnionFind(len(boxes))
+            kruskal = [edge for edge in edges if uf.union(edge[1], edge[2])]
+            self.assertEqual(sorted(euclidean_mst(boxes)), kruskal)
+
+    def test_euclidean_mst_small(self):
+        """Test the tree on tiny inputs."""
+        self.assertEqual(euclidean_mst([]), [])
+        self.assertEqual(euclidean_mst([(1, 2, 3)]), [])
+        self.assertEqual(sorted(euclidean_mst([(0, 0, 0), (10, 0, 0), (0, 10, 0)])),
+                         [(100, 0, 1), (100, 0, 2)])
+
+
+    # Pairwise kernel tests
+    def test_squared_distance_row(self):
+        """Test the row kernel against the scalar squared distance."""
+        boxes = [(0, 0, 0), (3, 4, 0), (1, 1, 1), (-2, 0, 5)]
+        self.assertEqual(squared_distance_row(boxes, 0, [1, 2, 3]), [25, 3, 29])
+        self.assertEqual(squared_distance_row(boxes, 2, []), [])
+
+    def test_smallest_edges_blocked_matches_full_sort(self):
+        """Test blocked selection for several block sizes and edge counts."""
+        rng = random.Random(43)
+        boxes = [(rng.randint(0, 20), rng.randint(0, 20), rng.randint(0, 20)) for _ in range(50)]
+        all_edges = sorted((squared_distance(boxes[i], boxes[j]), i, j)
+                           for i in range(len(boxes)) for j in range(i + 1, len(boxes)))
+        for block_size in (1, 7, 64):
+            for num_edges in (0, 1, 30, len(all_edges) + 1):
+                self.assertEqual(smallest_edges_blocked(boxes, num_edges, block_size), all_edges[:num_edges])
+
+    def test_solve_part1_coplanar_large(self):
+        """Test Part 1 on coplanar boxes above the brute-force cutoff."""
+        test_file = "test_coplanar.txt"
+        rng = random.Random(45)
+        boxes = [(rng.randint(0, 10 ** 5), rng.randint(0, 10 ** 5), 5) for _ in range(500)]
+        with open(test_file, 'w') as f:
+            for box in boxes:
+                f.write(",".join(map(str, box)) + "\n")
+
+        uf = UnionFind(len(boxes))
+        for _, i, j in smallest_edges_blocked(boxes, 1000):
+            uf.union(i, j)
+        expected = 1
+        for size in uf.largest_component_sizes(3):
+            expected *= size
+        self.assertEqual(solve_part1(test_file, num_pairs=1000), expected)
+
+        os.remove(test_file)
+
+    def test_select_shortest_edges_identical_boxes(self):
+        """Test boxes all at one point are routed to the brute-force selection."""
+        boxes = [(3, 3, 3)] * (solution.BRUTE_FORCE_MAX_BOXES + 1)
+        edges = select_shortest_edges(boxes, 3)
+        self.assertIsInstance(edges, list)
+        self.assertEqual(edges, [(0, 0, 1), (0, 0, 2), (0, 0, 3)])
+
+    def test_solve_part1_brute_force_matches_stream(self):
+        """Test the small-input brute-force path against the edge stream path."""
+        test_file = "test_brute_force.txt"
+        rng = random.Random(47)
+        with open(test_file, 'w') as f:
+            for _ in range(60):
+                f.write(f"{rng.randint(0, 30)},{rng.randint(0, 30)},{rng.randint(0, 30)}\n")
+
+        brute_force = [solve_part1(test_file, num_pairs) for num_pairs in (1, 20, 200)]
+        saved = solution.BRUTE_FORCE_MAX_BOXES
+        solution.BRUTE_FORCE_MAX_BOXES = 0
+        try:
+            streamed = [solve_part1(test_file, num_pairs) for num_pairs in (1, 20, 200)]
+        finally:
+            solution.BRUTE_FORCE_MAX_BOXES = saved
+        self.assertEqual(brute_force, streamed)
+
+        os.remove(test_file)
+
+
+    # Array-backed Union-Find tests
+    def test_union_find_component_count_and_multiset(self):
+        """Test the maintained component count and size multiset."""
+        uf = UnionFind(7)
+        self.assertEqual(uf.num_components, 7)
+        self.assertEqual(uf.size_counts, {1: 7})
+
+        uf.union(0, 1)
+        uf.union(2, 3)
+        uf.union(3, 4)
+        self.assertFalse(uf.union(2, 4))
+        self.assertEqual(uf.num_components, 4)
+        self.assertEqual(uf.size_counts, {1: 2, 2: 1, 3: 1})
+
+        uf.union(0, 4)
+        self.assertEqual(uf.size_counts, {1: 2, 5: 1})
+        self.assertEqual(uf.size[uf.find(1)], 5)
+
+    def test_union_find_largest_component_sizes(self):
+        """Test the top-k component sizes at several points."""
+        uf = UnionFind(8)
+        self.assertEqual(uf.largest_component_sizes(3), [1, 1, 1])
+        uf.union(0, 1)
+        uf.union(2, 3)
+        uf.union(2, 4)
+        self.assertEqual(uf.largest_component_sizes(3), [3, 2, 1])
+        self.assertEqual(uf.largest_component_sizes(10), [3, 2, 1, 1, 1])
+        self.assertEqual(UnionFind(2).largest_component_sizes(3), [1, 1])
+        self.assertEqual(UnionFind(0).largest_component_sizes(3), [])
+
+    def test_union_find_deep_chain(self):
+        """Test find on a chain far deeper than the recursion limit."""
+        n = 100000
+        uf = UnionFind(n)
+        # Build a worst-case chain by hand: i -> i + 1
+        for i in range(n - 1):
+            uf.parent[i] = i + 1
+        self.assertEqual(uf.find(0), n - 1)
+        # Path halving points every other node on the path at its grandparent
+        self.assertEqual(uf.parent[0], 2)
+        self.assertEqual(uf.find(0), n - 1)
+
+
+    # Connectivity timeline tests
+    def test_connectivity_timeline_example(self):
+        """Test several checkpoints on the example against separate solves."""
+        test_file = "test_timeline.txt"
+        example = """162,817,812
+57,618,57
+906,360,560
+592,479,940
+352,342,300
+466,668,158
+542,29,236
+431,825,988
+739,650,466
+52,470,668
+216,146,977
+819,987,18
+117,168,530
+805,96,715
+346,949,466
+970,615,88
+941,993,340
+862,61,35
+984,92,344
+425,690,689"""
+
+        with open(test_file, 'w') as f:
+            f.write(example)
+
+        checkpoints = [0, 1, 5, 10, 25, 100, 1000]
+        results = solve_part1_checkpoints(test_file, checkpoints)
+        self.assertEqual(results[10], 40)
+        for num_pairs in checkpoints:
+            self.assertEqual(results[num_pairs], solve_part1(test_file, num_pairs=num_pairs))
+
+        os.remove(test_file)
+
+    def test_connectivity_timeline_coplanar(self):
+        """Test the timeline on coplanar boxes matches Part 1 at each checkpoint."""
+        test_file = "test_timeline_coplanar.txt"
+        rng = random.Random(46)
+        with open(test_file, 'w') as f:
+            for _ in range(100):
+                f.write(f"{rng.randint(0, 10 ** 5)},{rng.randint(0, 10 ** 5)},5\n")
+
+        checkpoints = [10, 100, 1000]
+        results = solve_part1_checkpoints(test_file, checkpoints)
+        for num_pairs in checkpoints:
+            self.assertEqual(results[num_pairs], solve_part1(test_file, num_pairs=num_pairs))
+
+        os.remove(test_file)
+
+    def test_connectivity_timeline_component_counts(self):
+        """Test the recorded component counts."""
+        boxes = [(0, 0, 0), (1, 0, 0), (10, 0, 0), (12, 0, 0), (100, 0, 0)]
+        timeline = connectivity_timeline(boxes, [3, 0, 1, 2, 50])
+        self.assertEqual(timeline[0], (1, 5))
+        self.assertEqual(timeline[1], (2, 4))
+        self.assertEqual(timeline[2], (4, 3))
+        self.assertEqual(timeline[3], (4, 2))
+        self.assertEqual(timeline[50], (5, 1))
+
+
+    # Incremental insertion tests
+    def test_spatial_grid_insert_and_within(self):
+        """Test radius queries after inserting boxes into an empty grid."""
+        grid = SpatialGrid([], cell_size=5)
+        for box in [(0, 0, 0), (3, 0, 0), (0, 4, 0), (20, 20, 20), (-6, 0, 0)]:
+            grid.insert(box)
+        self.assertEqual(grid.within(0, 16), [(9, 1), (16, 2)])
+        self.assertEqual(grid.within(0, 36), [(9, 1), (16, 2), (36, 4)])
+        self.assertEqual(grid.within(3, 10), [])
+
+    def test_union_find_add(self):
+        """Test adding singleton sets to a Union-Find."""
+        uf = UnionFind(0)
+        self.assertEqual(uf.add(), 0)
+        self.assertEqual(uf.add(), 1)
+        self.assertTrue(uf.union(0, 1))
+        self.assertEqual(uf.add(), 2)
+        self.assertEqual(uf.num_components, 2)
+        self.assertEqual(uf.largest_component_sizes(3), [2, 1])
+
+    def test_dynamic_circuits_threshold_components(self):
+        """Test threshold circuits against a brute-force union of close pairs."""
+        rng = random.Random(46)
+        boxes = [(rng.randint(0, 300), rng.randint(0, 300), rng.randint(0, 300)) for _ in range(80)]
+        threshold_sq = 60 ** 2
+        circuits = DynamicCircuits(threshold_sq)
+        for count, box in enumerate(boxes, start=1):
+            circuits.insert(box)
+            if count % 20 == 0:
+                uf = UnionFind(count)
+                for i in range(count):
+                    for j in range(i + 1, count):
+                        if squared_distance(boxes[i], boxes[j]) <= threshold_sq:
+                            uf.union(i, j)
+                self.assertEqual(sorted(circuits.uf.get_component_sizes()), sorted(uf.get_component_sizes()))
+                self.assertEqual(circuits.largest_circuits_product(), math.prod(uf.largest_component_sizes(3)))
+
+    def test_dynamic_circuits_mst_matches_part2(self):
+        """Test the incremental MST gives the Part 2 answer after every insertion."""
+        rng = random.Random(7)
+        boxes = [(rng.randint(0, 50), rng.randint(0, 50), rng.randint(0, 50)) for _ in range(40)]
+        circuits = DynamicCircuits(0)
+        self.assertEqual(circuits.last_connection_product(), 0)
+        for count, box in enumerate(boxes, start=1):
+            circuits.insert(box)
+            self.assertEqual(sorted(circuits.mst_edges), sorted(euclidean_mst(boxes[:count])))
+
+    def test_dynamic_circuits_example(self):
+        """Test the example's Part 2 answer after inserting every box."""
+        test_file = "test_dynamic.txt"
+        example = """162,817,812
+57,618,57
+906,360,560
+592,479,940
+352,342,300
+466,668,158
+542,29,236
+431,825,988
+739,650,466
+52,470,668
+216,146,977
+819,987,18
+117,168,530
+805,96,715
+346,949,466
+970,615,88
+941,993,340
+862,61,35
+984,92,344
+425,690,689"""
+
+        with open(test_file, 'w') as f:
+            f.write(example)
+
+        circuits = DynamicCircuits(100 ** 2)
+        for box in parse_junction_boxes(test_file):
+            circuits.insert(box)
+        self.assertEqual(circuits.last_connection_product(), 25272)
+
+        os.remove(test_file)
+
+
 if __name__ == "__main__":
     unittest.main(verbosity=2)
@@ -1,3 +1,9 @@
+import heapq
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from collections.abc import Mapping
+
+
 def parse_red_tiles(input_file):
     """
     Parse the input file to get red tile positions.
@@ -137,6 +143,28 @@ def build_vertical_segments(red_tiles):
     return segments
 
 
+def merge_ranges(ranges):
+    """
+    Merge overlapping or adjacent (x_start, x_end) ranges.
+    Returns a sorted list of disjoint ranges.
+    """
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def crossing_ranges(crossings):
+    """
+    Pair sorted vertical edge crossings into inside (x_start, x_end) ranges.
+    Along a row the crossings alternate between entering and leaving.
+    """
+    return list(zip(crossings[0::2], crossings[1::2]))
+
+
 def compute_valid_ranges_at_y(y, vertical_segments, horizontal_segments, red_tiles):
     """
     Compute valid x-ranges at a specific y-coordinate.
@@ -144,94 +172,131 @@ def compute_valid_ranges_at_y(y, vertical_segments, horizontal_segments, red_til
 
     A tile at (x, y) is valid if it's:
     - On a horizontal segment at this y
-    - On a vertical segment that includes this y
-    - Inside the polygon
+    - Inside (or on the boundary of) the polygon just above or just below y
+    The inside ranges come from the crossing parity of vertical segments,
+    so red_tiles is only kept for interface compatibility.
     """
-    ranges = []
+    ranges = [(x_start, x_end) for seg_y, x_start, x_end in horizontal_segments if seg_y == y]
 
-    # Add horizontal segments on this row (boundary)
-    for seg_y, x_start, x_end in horizontal_segments:
-        if seg_y == y:
-            ranges.append((x_start, x_end))
+    # Vertical segments crossing the rows just above and just below y
+    above = sorted(x for x, y_start, y_end in vertical_segments if y_start < y <= y_end)
+    below = sorted(x for x, y_start, y_end in vertical_segments if y_start <= y < y_end)
+    ranges.extend(crossing_ranges(above))
+    ranges.extend(crossing_ranges(below))
+
+    return merge_ranges(ranges)
 
-    # Add vertical segments that touch this row (boundary)
-    for x, y_start, y_end in vertical_segments:
-        if y_start <= y <= y_end:
-            ranges.append((x, x))
 
-    # Find interior ranges using point-in-polygon for the x values that matter
-    # Get all x-coordinates from vertical segments
-    all_x = set()
+def sweep_band_ranges(vertical_segments, critical_ys):
+    """
+    Sweep an active edge table across the critical ys.
+    Returns band_ranges where band_ranges[k] lists the inside (x_start, x_end)
+    ranges for rows strictly between critical_ys[k] and critical_ys[k + 1].
+
+    The active table is the sorted list of x-coordinates of the vertical
+    segments spanning the current band; each segment is inserted at its
+    y_start and removed at its y_end by bisection.
+    """
+    starts = {}
+    ends = {}
     for x, y_start, y_end in vertical_segments:
-        all_x.add(x)
-    for seg_y, x_start, x_end in horizontal_segments:
-        all_x.add(x_start)
-        all_x.add(x_end)
-
-    all_x = sorted(all_x)
-
-    # Check interior between consecutive x values
-    for i in range(len(all_x) - 1):
-        x1, x2 = all_x[i], all_x[i + 1]
-        if x2 > x1 + 1:
-            # Check if the midpoint is inside the polygon
-            mid_x = (x1 + x2) // 2
-            if is_point_inside_polygon(mid_x, y, red_tiles):
-                ranges.append((x1, x2))
-
-    # Merge overlapping ranges
-    if not ranges:
-        return []
-
-    ranges.sort()
-    merged = [ranges[0]]
-    for start, end in ranges[1:]:
-        if start <= merged[-1][1] + 1:
-            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
-        else:
-            merged.append((start, end))
+        if y_start < y_end:
+            starts.setdefault(y_start, []).append(x)
+            ends.setdefault(y_end, []).append(x)
 
-    return merged
+    active = []
+    band_ranges = []
+    for y in critical_ys[:-1]:
+        # Remove before inserting so collinear segments meeting at y swap cleanly
+        for x in ends.get(y, ()):
+            del active[bisect_left(active, x)]
+        for x in starts.get(y, ()):
+            insort(active, x)
+        band_ranges.append(crossing_ranges(active))
+
+    return band_ranges
+
+
+def critical_row_ranges(critical_ys, band_ranges, horizontal_segments):
+    """
+    Compute valid x-ranges on each critical row from the neighbouring bands.
+    A critical row is valid wherever either adjacent band is inside or a
+    horizontal segment lies on it.
+    Returns a list parallel to critical_ys.
+    """
+    boundary = {}
+    for y, x_start, x_end in horizontal_segments:
+        boundary.setdefault(y, []).append((x_start, x_end))
+
+    rows = []
+    for k, y in enumerate(critical_ys):
+        ranges = list(boundary.get(y, []))
+        if k > 0:
+            ranges.extend(band_ranges[k - 1])
+        if k < len(band_ranges):
+            ranges.extend(band_ranges[k])
+        rows.append(merge_ranges(ranges))
+    return rows
+
+
+class BandRanges(Mapping):
+    """
+    Read-only mapping y -> valid (x_start, x_end) ranges stored per band.
+
+    Holds one entry per critical y and one per gap between critical ys, so
+    memory is proportional to the vertex count rather than the y span.
+    Lookups bisect into the sorted critical ys.
+    """
+
+    def __init__(self, critical_ys, critical_ranges, gap_ranges):
+        self.critical_ys = critical_ys
+        self.critical_ranges = critical_ranges
+        # gap_ranges[k] covers rows strictly between critical_ys[k] and [k + 1]
+        self.gap_ranges = gap_ranges
+
+    def __getitem__(self, y):
+        k = bisect_right(self.critical_ys, y) - 1
+        if k < 0:
+            raise KeyError(y)
+        if self.critical_ys[k] == y:
+            return self.critical_ranges[k]
+        if k < len(self.gap_ranges):
+            return self.gap_ranges[k]
+        raise KeyError(y)
+
+    def __iter__(self):
+        if self.critical_ys:
+            return iter(range(self.critical_ys[0], self.critical_ys[-1] + 1))
+        return iter(())
+
+    def __len__(self):
+        if self.critical_ys:
+            return self.critical_ys[-1] - self.critical_ys[0] + 1
+        return 0
 
 
 def compute_y_bands(red_tiles, vertical_segments, horizontal_segments):
     """
     Compute valid x-ranges for each y-coordinate that might be needed.
     Uses coordinate compression to avoid iterating over all y values.
-    Returns dict mapping y -> list of valid (x_start, x_end) ranges.
+    Returns a BandRanges mapping y -> list of valid (x_start, x_end) ranges.
     Also returns a sorted list of all critical y-coordinates.
     """
     # Critical y-coordinates where the polygon shape changes
-    critical_ys = set()
-    for x, y in red_tiles:
-        critical_ys.add(y)
-
-    critical_ys = sorted(critical_ys)
-
-    bands = {}
+    critical_ys = sorted({y for x, y in red_tiles})
 
-    # Compute ranges for each critical y and the band below it
-    for idx, y in enumerate(critical_ys):
-        bands[y] = compute_valid_ranges_at_y(y, vertical_segments, horizontal_segments, red_tiles)
+    # Interior rows of a band share ranges (determined by segments spanning across)
+    band_ranges = sweep_band_ranges(vertical_segments, critical_ys)
+    critical_ranges = critical_row_ranges(critical_ys, band_ranges, horizontal_segments)
+    gap_ranges = [merge_ranges(ranges) for ranges in band_ranges]
 
-        # For the band between this y and the next critical y (exclusive)
-        if idx < len(critical_ys) - 1:
-            next_y = critical_ys[idx + 1]
-            if next_y > y + 1:
-                # Interior rows have the same ranges (determined by segments spanning across)
-                test_y = y + 1
-                interior_ranges = compute_valid_ranges_at_y(test_y, vertical_segments, horizontal_segments, red_tiles)
-                # Store for all interior rows (we'll use lazy lookup)
-                for interior_y in range(y + 1, next_y):
-                    bands[interior_y] = interior_ranges
-
-    return bands, critical_ys
+    return BandRanges(critical_ys, critical_ranges, gap_ranges), critical_ys
 
 
 def is_rectangle_valid(min_x, max_x, min_y, max_y, row_ranges):
     """
     Check if rectangle from (min_x, min_y) to (max_x, max_y) is fully valid.
-    row_ranges is a dict mapping y -> list of valid (x_start, x_end) ranges.
+    row_ranges maps y -> list of valid (x_start, x_end) ranges.
     """
     for y in range(min_y, max_y + 1):
         if y not in row_ranges:
@@ -286,44 +351,205 @@ def is_rectangle_valid_fast(min_x, max_x, min_y, max_y, row_ranges, critical_ys)
     return True
 
 
-def solve_part2(input_file):
+def compute_band_ranges(red_tiles):
     """
-    Solve Part 2: Find largest rectangle where all tiles are red or green.
-    Uses coordinate compression for efficiency with large rectilinear polygons.
+    Compute the inside x-ranges of every open band between critical ys.
+    Returns (critical_ys, band_ranges) where band_ranges[k] lists the
+    (x_start, x_end) ranges that are red or green on every row strictly
+    between critical_ys[k] and critical_ys[k + 1].
     """
-    red_tiles = parse_red_tiles(input_file)
+    critical_ys = sorted({y for x, y in red_tiles})
+    band_ranges = sweep_band_ranges(build_vertical_segments(red_tiles), critical_ys)
+    return critical_ys, band_ranges
 
-    # Build segment lists
-    vertical_segments = build_vertical_segments(red_tiles)
-    horizontal_segments = build_horizontal_segments(red_tiles)
 
-    # Compute y-bands with valid x-ranges
-    row_ranges, critical_ys = compute_y_bands(red_tiles, vertical_segments, horizontal_segments)
+class CompressedGrid:
+    """
+    Coordinate-compressed red/green map with a 2-D prefix sum of bad cells.
 
-    max_area = 0
+    Each axis is split into slots: slot 2*i is the i-th critical coordinate
+    and slot 2*i + 1 holds the integers strictly between it and the next one.
+    Every (row slot, column slot) cell is uniformly valid or invalid, so a
+    rectangle with red-tile corners is checked with four table lookups.
+    """
 
-    # Check all pairs of red tiles as opposite corners
-    for i in range(len(red_tiles)):
-        for j in range(i + 1, len(red_tiles)):
-            x1, y1 = red_tiles[i]
-            x2, y2 = red_tiles[j]
+    def __init__(self, red_tiles):
+        xs = sorted({x for x, y in red_tiles})
+        critical_ys, band_ranges = compute_band_ranges(red_tiles)
+        horizontal_segments = build_horizontal_segments(red_tiles)
+
+        self.x_slot = {x: 2 * i for i, x in enumerate(xs)}
+        self.y_slot = {y: 2 * i for i, y in enumerate(critical_ys)}
+
+        # Representative x per column slot; None marks an empty gap slot
+        slot_xs = []
+        for i, x in enumerate(xs):
+            slot_xs.append(x)
+            if i + 1 < len(xs):
+                slot_xs.append(x + 1 if xs[i + 1] > x + 1 else None)
+
+        width = len(slot_xs)
+        self.prefix = [array('q', bytes(8 * (width + 1)))]
+        critical_ranges = critical_row_ranges(critical_ys, band_ranges, horizontal_segments)
+        for k, y in enumerate(critical_ys):
+            self._add_row(slot_xs, critical_ranges[k])
+            if k < len(band_ranges):
+                if critical_ys[k + 1] > y + 1:
+                    self._add_row(slot_xs, band_ranges[k])
+                else:
+                    self._add_row(slot_xs, None)
+
+    def _add_row(self, slot_xs, ranges):
+        """
+        Append the prefix-sum row for one row slot.
+        ranges=None marks an empty gap slot, which never invalidates anything.
+        """
+        above = self.prefix[-1]
+        row = array('q', above)
+        bad = 0
+        r = 0
+        for c, x in enumerate(slot_xs):
+            if ranges is not None and x is not None:
+                while r < len(ranges) and ranges[r][1] < x:
+                    r += 1
+                if r == len(ranges) or x < ranges[r][0]:
+                    bad += 1
+            row[c + 1] = above[c + 1] + bad
+        self.prefix.append(row)
+
+    def is_rectangle_valid(self, min_x, max_x, min_y, max_y):
+        """
+        Check if the rectangle is fully red or green in O(1).
+        All four bounds must be coordinates of red tiles.
+        """
+        c0, c1 = self.x_slot[min_x], self.x_slot[max_x] + 1
+        r0, r1 = self.y_slot[min_y], self.y_slot[max_y] + 1
+        p0, p1 = self.prefix[r0], self.prefix[r1]
+        return p1[c1] - p0[c1] - p1[c0] + p0[c0] == 0
+
+
+def corner_quadrants(red_tiles, grid):
+    """
+    Find the quadrants each red tile can open a rectangle towards.
+    Returns a list of sets of (dx, dy) sign pairs, one set per red tile.
 
-            min_x, max_x = min(x1, x2), max(x1, x2)
-            min_y, max_y = min(y1, y2), max(y1, y2)
+    Every rectangle with a corner at (x, y) opening towards (dx, dy) contains
+    the small rectangle reaching the nearest critical x and y in that
+    direction, so if that one is invalid the corner can never be extreme there.
+    """
+    xs = sorted({x for x, y in red_tiles})
+    ys = sorted({y for x, y in red_tiles})
 
-            width = max_x - min_x + 1
-            height = max_y - min_y + 1
-            area = width * height
+    quadrants = []
+    for x, y in red_tiles:
+        i = bisect_left(xs, x)
+        j = bisect_left(ys, y)
+        open_towards = set()
+        for dx in (-1, 1):
+            if not 0 <= i + dx < len(xs):
+                continue
+            nx = xs[i + dx]
+            for dy in (-1, 1):
+                if not 0 <= j + dy < len(ys):
+                    continue
+                ny = ys[j + dy]
+                if grid.is_rectangle_valid(min(x, nx), max(x, nx), min(y, ny), max(y, ny)):
+                    open_towards.add((dx, dy))
+        quadrants.append(open_towards)
+    return quadrants
+
+
+# Candidates buffered per red tile between rescans of its partners
+CANDIDATE_BLOCK = 64
 
-            # Skip if this can't beat current max
-            if area <= max_area:
+
+def _iter_row_candidates(red_tiles, i, quadrants):
+    """
+    Yield the candidates pairing red tile i with every later tile j > i,
+    as (area, j, min_x, max_x, min_y, max_y) tuples in tile order.
+    """
+    x1, y1 = red_tiles[i]
+    for j in range(i + 1, len(red_tiles)):
+        x2, y2 = red_tiles[j]
+        if quadrants is not None and x1 != x2 and y1 != y2:
+            dx = 1 if x2 > x1 else -1
+            dy = 1 if y2 > y1 else -1
+            if (dx, dy) not in quadrants[i] or (-dx, -dy) not in quadrants[j]:
                 continue
 
-            # Check if rectangle is valid using fast band-based check
-            if is_rectangle_valid_fast(min_x, max_x, min_y, max_y, row_ranges, critical_ys):
-                max_area = area
+        min_x, max_x = min(x1, x2), max(x1, x2)
+        min_y, max_y = min(y1, y2), max(y1, y2)
+        yield (max_x - min_x + 1) * (max_y - min_y + 1), j, min_x, max_x, min_y, max_y
 
-    return max_area
+
+def _next_row_block(red_tiles, i, quadrants, below=None):
+    """
+    Return the next CANDIDATE_BLOCK candidates of tile i, largest first.
+    With below, only candidates ordered strictly before it are considered
+    ((area, j) is unique within a row, so nothing is skipped or repeated).
+    """
+    candidates = _iter_row_candidates(red_tiles, i, quadrants)
+    if below is not None:
+        candidates = (candidate for candidate in candidates if candidate < below)
+    return heapq.nlargest(CANDIDATE_BLOCK, candidates)
+
+
+def iter_candidates_by_area(red_tiles, quadrants=None):
+    """
+    Yield candidate rectangles from red-tile pairs in descending area order.
+    Yields (area, min_x, max_x, min_y, max_y) tuples.
+
+    With quadrants from corner_quadrants, pairs where either corner cannot
+    open towards the other are dropped. Pairs sharing a row or column have
+    no quadrant and are always kept.
+
+    The heap holds one entry per tile i, pointing into a block of that tile's
+    next CANDIDATE_BLOCK largest pairs (i, j > i). When a block runs out the
+    tile's partners are rescanned for the next block, so memory stays at
+    O(n * CANDIDATE_BLOCK) instead of materialising all n² pairs.
+    """
+    heap = []
+    for i in range(len(red_tiles)):
+        block = _next_row_block(red_tiles, i, quadrants)
+        if block:
+            heap.append((-block[0][0], i, 0, block))
+    heapq.heapify(heap)
+
+    while heap:
+        _, i, pos, block = heapq.heappop(heap)
+        area, _, min_x, max_x, min_y, max_y = block[pos]
+        yield area, min_x, max_x, min_y, max_y
+
+        if pos + 1 < len(block):
+            heapq.heappush(heap, (-block[pos + 1][0], i, pos + 1, block))
+        elif len(block) == CANDIDATE_BLOCK:
+            block = _next_row_block(red_tiles, i, quadrants, below=block[-1])
+            if block:
+                heapq.heappush(heap, (-block[0][0], i, 0, block))
+
+
+def find_largest_valid_rectangle(red_tiles, grid):
+    """
+    Find the largest rectangle with red-tile corners that is fully valid.
+    Candidates are checked in descending area order, so the first valid one
+    is the answer. Returns 0 if there is none.
+    """
+    quadrants = corner_quadrants(red_tiles, grid)
+    for area, min_x, max_x, min_y, max_y in iter_candidates_by_area(red_tiles, quadrants):
+        if grid.is_rectangle_valid(min_x, max_x, min_y, max_y):
+            return area
+    return 0
+
+
+def solve_part2(input_file):
+    """
+    Solve Part 2: Find largest rectangle where all tiles are red or green.
+    Uses a coordinate-compressed prefix-sum grid so each pair is checked in O(1),
+    visiting pruned candidate pairs largest first.
+    """
+    red_tiles = parse_red_tiles(input_file)
+    grid = CompressedGrid(red_tiles)
+    return find_largest_valid_rectangle(red_tiles, grid)
 
 
 if __name__ == "__main__":
@@ -1,12 +1,29 @@
 import unittest
 import os
+import solution
 from solution import (
     parse_red_tiles, calculate_rectangle_area, solve_part1, solve_part2,
     is_point_inside_polygon, get_green_tiles, build_horizontal_segments,
-    build_vertical_segments, compute_valid_ranges_at_y
+    build_vertical_segments, compute_valid_ranges_at_y, merge_ranges,
+    compute_band_ranges, CompressedGrid, compute_y_bands, BandRanges,
+    is_rectangle_valid, is_rectangle_valid_fast, crossing_ranges,
+    sweep_band_ranges, critical_row_ranges, corner_quadrants,
+    iter_candidates_by_area, find_largest_valid_rectangle
 )
 
 
+def brute_force_valid(min_x, max_x, min_y, max_y, green_tiles):
+    """Check a rectangle tile by tile against the full green tile set."""
+    return all((x, y) in green_tiles
+               for x in range(min_x, max_x + 1)
+               for y in range(min_y, max_y + 1))
+
+
+# Rectilinear loops used to cross-check the compressed grid
+U_SHAPE = [(0, 0), (10, 0), (10, 8), (7, 8), (7, 3), (3, 3), (3, 8), (0, 8)]
+NARROW_NOTCH = [(0, 0), (5, 0), (5, 4), (3, 4), (3, 2), (2, 2), (2, 4), (0, 4)]
+
+
 class TestMovieTheater(unittest.TestCase):
 
     def test_parse_red_tiles(self):
@@ -307,6 +324,188 @@ class TestPart2(unittest.TestCase):
 
         os.remove(test_file)
 
+    def test_compute_y_bands_lookup(self):
+        """Test band lookup for critical, interior and out-of-span rows."""
+        vertical_segments = build_vertical_segments(self.red_tiles)
+        horizontal_segments = build_horizontal_segments(self.red_tiles)
+        row_ranges, critical_ys = compute_y_bands(self.red_tiles, vertical_segments, horizontal_segments)
+
+        self.assertIsInstance(row_ranges, BandRanges)
+        self.assertEqual(critical_ys, [1, 3, 5, 7])
+        self.assertEqual(row_ranges[1], [(7, 11)])
+        self.assertEqual(row_ranges[2], [(7, 11)])
+        self.assertEqual(row_ranges[4], [(2, 11)])
+        self.assertEqual(row_ranges[6], [(9, 11)])
+        self.assertNotIn(0, row_ranges)
+        self.assertNotIn(8, row_ranges)
+        self.assertEqual(len(row_ranges), 7)
+        self.assertEqual(list(row_ranges), list(range(1, 8)))
+
+    def test_compute_y_bands_matches_per_row(self):
+        """Every row in the span matches a direct range computation."""
+        vertical_segments = build_vertical_segments(U_SHAPE)
+        horizontal_segments = build_horizontal_segments(U_SHAPE)
+        row_ranges, critical_ys = compute_y_bands(U_SHAPE, vertical_segments, horizontal_segments)
+        for y in range(0, 9):
+            self.assertEqual(row_ranges[y],
+                             compute_valid_ranges_at_y(y, vertical_segments, horizontal_segments, U_SHAPE))
+        self.assertTrue(is_rectangle_valid(0, 10, 0, 3, row_ranges))
+        self.assertFalse(is_rectangle_valid(0, 10, 0, 8, row_ranges))
+        self.assertFalse(is_rectangle_valid_fast(0, 10, 0, 8, row_ranges, critical_ys))
+
+    def test_compute_y_bands_huge_span(self):
+        """Memory follows the vertex count even for a span of billions of rows."""
+        red_tiles = [(0, 0), (10, 0), (10, 3_000_000_000), (0, 3_000_000_000)]
+        vertical_segments = build_vertical_segments(red_tiles)
+        horizontal_segments = build_horizontal_segments(red_tiles)
+        row_ranges, critical_ys = compute_y_bands(red_tiles, vertical_segments, horizontal_segments)
+        self.assertEqual(len(row_ranges.critical_ranges), 2)
+        self.assertEqual(len(row_ranges.gap_ranges), 1)
+        self.assertEqual(row_ranges[1_234_567_890], [(0, 10)])
+        self.assertTrue(is_rectangle_valid_fast(0, 10, 0, 3_000_000_000, row_ranges, critical_ys))
+
+    def test_crossing_ranges(self):
+        """Test pairing of sorted crossings into inside ranges."""
+        self.assertEqual(crossing_ranges([0, 3, 7, 10]), [(0, 3), (7, 10)])
+        self.assertEqual(crossing_ranges([]), [])
+
+    def test_sweep_band_ranges(self):
+        """Test the active edge sweep on the U shape."""
+        vertical_segments = build_vertical_segments(U_SHAPE)
+        self.assertEqual(sweep_band_ranges(vertical_segments, [0, 3, 8]),
+                         [[(0, 10)], [(0, 3), (7, 10)]])
+
+    def test_sweep_band_ranges_collinear_segments(self):
+        """Vertical segments meeting end to end at one x hand over cleanly."""
+        red_tiles = [(0, 0), (4, 0), (4, 2), (4, 5), (0, 5), (0, 2)]
+        vertical_segments = build_vertical_segments(red_tiles)
+        self.assertEqual(sweep_band_ranges(vertical_segments, [0, 2, 5]),
+                         [[(0, 4)], [(0, 4)]])
+
+    def test_critical_row_ranges(self):
+        """Critical rows combine both neighbouring bands and boundary segments."""
+        critical_ys, band_ranges = compute_band_ranges(U_SHAPE)
+        horizontal_segments = build_horizontal_segments(U_SHAPE)
+        self.assertEqual(critical_row_ranges(critical_ys, band_ranges, horizontal_segments),
+                         [[(0, 10)], [(0, 10)], [(0, 3), (7, 10)]])
+
+    def test_compute_valid_ranges_matches_green_tiles(self):
+        """Every row's ranges cover exactly the brute-force green tiles."""
+        for red_tiles in (self.red_tiles, U_SHAPE, NARROW_NOTCH):
+            vertical_segments = build_vertical_segments(red_tiles)
+            horizontal_segments = build_horizontal_segments(red_tiles)
+            green_tiles = get_green_tiles(red_tiles)
+            ys = [y for x, y in red_tiles]
+            for y in range(min(ys) - 1, max(ys) + 2):
+                ranges = compute_valid_ranges_at_y(y, vertical_segments, horizontal_segments, red_tiles)
+                covered = {(x, y) for x_start, x_end in ranges for x in range(x_start, x_end + 1)}
+                self.assertEqual(covered, {t for t in green_tiles if t[1] == y}, (red_tiles, y))
+
+    def test_merge_ranges(self):
+        """Test merging of overlapping and adjacent ranges."""
+        self.assertEqual(merge_ranges([(5, 7), (0, 2), (3, 4), (9, 9)]),
+                         [(0, 7), (9, 9)])
+        self.assertEqual(merge_ranges([]), [])
+
+    def test_compute_band_ranges(self):
+        """Test inside ranges for each open band of the example."""
+        critical_ys, band_ranges = compute_band_ranges(self.red_tiles)
+        self.assertEqual(critical_ys, [1, 3, 5, 7])
+        self.assertEqual(band_ranges, [[(7, 11)], [(2, 11)], [(9, 11)]])
+
+    def test_compressed_grid_matches_brute_force(self):
+        """Every red-corner rectangle agrees with the tile-by-tile check."""
+        for red_tiles in (self.red_tiles, U_SHAPE, NARROW_NOTCH):
+            grid = CompressedGrid(red_tiles)
+            green_tiles = get_green_tiles(red_tiles)
+            for x1, y1 in red_tiles:
+                for x2, y2 in red_tiles:
+                    min_x, max_x = min(x1, x2), max(x1, x2)
+                    min_y, max_y = min(y1, y2), max(y1, y2)
+                    self.assertEqual(
+                        grid.is_rectangle_valid(min_x, max_x, min_y, max_y),
+                        brute_force_valid(min_x, max_x, min_y, max_y, green_tiles),
+                        (red_tiles, x1, y1, x2, y2))
+
+    def test_compressed_grid_narrow_notch(self):
+        """A notch with no tiles between its walls leaves the box fully valid."""
+        grid = CompressedGrid(NARROW_NOTCH)
+        self.assertTrue(grid.is_rectangle_valid(0, 5, 0, 4))
+
+    def test_compressed_grid_u_shape(self):
+        """The cut-out of a U shape invalidates rectangles spanning it."""
+        grid = CompressedGrid(U_SHAPE)
+        self.assertFalse(grid.is_rectangle_valid(0, 10, 0, 8))
+        self.assertTrue(grid.is_rectangle_valid(0, 10, 0, 3))
+        self.assertTrue(grid.is_rectangle_valid(7, 10, 0, 8))
+
+    def test_corner_quadrants_square(self):
+        """Each corner of a square opens only towards the square's interior."""
+        red_tiles = [(0, 0), (4, 0), (4, 4), (0, 4)]
+        quadrants = corner_quadrants(red_tiles, CompressedGrid(red_tiles))
+        self.assertEqual(quadrants, [{(1, 1)}, {(-1, 1)}, {(-1, -1)}, {(1, -1)}])
+
+    def test_corner_quadrants_reflex_vertex(self):
+        """The reflex corners of a U shape open towards three quadrants."""
+        quadrants = corner_quadrants(U_SHAPE, CompressedGrid(U_SHAPE))
+        # (7, 3) and (3, 3) are the inner corners of the cut-out
+        self.assertEqual(quadrants[4], {(1, 1), (1, -1), (-1, -1)})
+        self.assertEqual(quadrants[5], {(-1, 1), (1, -1), (-1, -1)})
+        self.assertEqual(quadrants[0], {(1, 1)})
+
+    def test_iter_candidates_by_area_descending(self):
+        """Candidates come out largest first and cover every pair unpruned."""
+        candidates = list(iter_candidates_by_area(self.red_tiles))
+        areas = [c[0] for c in candidates]
+        self.assertEqual(areas, sorted(areas, reverse=True))
+        self.assertEqual(len(candidates), 28)
+        self.assertEqual(candidates[0], (50, 2, 11, 1, 5))
+
+    def test_iter_candidates_by_area_pruned(self):
+        """Pruning drops only candidates that fail validation."""
+        grid = CompressedGrid(U_SHAPE)
+        quadrants = corner_quadrants(U_SHAPE, grid)
+        pruned = set(iter_candidates_by_area(U_SHAPE, quadrants))
+        for candidate in iter_candidates_by_area(U_SHAPE):
+            if candidate not in pruned:
+                self.assertFalse(grid.is_rectangle_valid(*candidate[1:]), candidate)
+        self.assertLess(len(pruned), 28)
+
+    def test_iter_candidates_by_area_small_blocks(self):
+        """Refilling tiny per-tile blocks still yields every pair exactly once."""
+        expected = []
+        for i, (x1, y1) in enumerate(U_SHAPE):
+            for x2, y2 in U_SHAPE[i + 1:]:
+                min_x, max_x = min(x1, x2), max(x1, x2)
+                min_y, max_y = min(y1, y2), max(y1, y2)
+                expected.append(((max_x - min_x + 1) * (max_y - min_y + 1), min_x, max_x, min_y, max_y))
+
+        saved = solution.CANDIDATE_BLOCK
+        solution.CANDIDATE_BLOCK = 2
+        try:
+            candidates = list(iter_candidates_by_area(U_SHAPE))
+        finally:
+            solution.CANDIDATE_BLOCK = saved
+        self.assertEqual(sorted(candidates), sorted(expected))
+        areas = [c[0] for c in candidates]
+        self.assertEqual(areas, sorted(areas, reverse=True))
+
+    def test_find_largest_valid_rectangle_matches_all_pairs(self):
+        """The pruned search agrees with an exhaustive scan of all pairs."""
+        for red_tiles in (self.red_tiles, U_SHAPE, NARROW_NOTCH):
+            grid = CompressedGrid(red_tiles)
+            expected = max(
+                (area for area, *bounds in iter_candidates_by_area(red_tiles)
+                 if grid.is_rectangle_valid(*bounds)),
+                default=0)
+            self.assertEqual(find_largest_valid_rectangle(red_tiles, grid), expected)
+        self.assertEqual(find_largest_valid_rectangle(U_SHAPE, CompressedGrid(U_SHAPE)), 36)
+
+    def test_actual_input_part2_value(self):
+        """Test Part 2 against the known answer for the actual input."""
+        if os.path.exists("input.txt"):
+            self.assertEqual(solve_part2("input.txt"), 1429075575)
+
     def test_actual_input_part2(self):
         """Test Part 2 with the actual input file."""
         if os.path.exists("input.txt"):